@@ -1,27 +1,144 @@
+import hashlib
+import hmac
 from django.db import models
 from django.conf import settings
-from cryptography.fernet import Fernet
-from django.core.exceptions import ImproperlyConfigured
+from cryptography.fernet import Fernet, MultiFernet
+from django.core.exceptions import EmptyResultSet, FieldError, ImproperlyConfigured
+from django.db.models.expressions import Col
+from django.db.models.query_utils import DeferredAttribute
+from drf_internals.cache import LRUCache
 
 # print(Fernet.generate_key()) : generate the key and store it safely in the env or secure vault
 
-if not hasattr(settings, 'FERNET_KEY'):
-    raise ImproperlyConfigured("FERNET_KEY is improperly configured")
+def get_fernet_keys():
+    """
+    FERNET_KEYS: the first key encrypts, every key decrypts (legacy keys during a
+    rotation). A single FERNET_KEY is still accepted.
+    """
+    keys = getattr(settings, 'FERNET_KEYS', None)
+    if keys is None and hasattr(settings, 'FERNET_KEY'):
+        keys = [settings.FERNET_KEY]
+    if not keys:
+        raise ImproperlyConfigured("FERNET_KEYS is improperly configured")
+    return list(keys)
+
+# Same encrypt()/decrypt() as Fernet, plus rotate() for rotate_encryption_keys
+fernet = MultiFernet([Fernet(key) for key in get_fernet_keys()])
+
+
+# Plaintexts stay in process memory, so this is opt-in: 0 turns it off
+decrypt_cache = LRUCache(getattr(settings, 'ENCRYPTED_FIELD_CACHE_SIZE', 0))
+
+def decrypt(ciphertext):
+    """Decrypts a stored value, through decrypt_cache when it's enabled."""
+    digest = None
+    if decrypt_cache.maxsize:
+        # Keyed by the SHA-256 of the token, 32 bytes however long the note is.
+        # Fernet tokens are unique per encryption, equal plaintexts saved twice are two entries.
+        digest = hashlib.sha256(ciphertext.encode('utf-8')).digest()
+        plaintext = decrypt_cache.get(digest)
+        if plaintext is not None:
+            return plaintext
+    try:
+        # The value of db is string, needs to be in bytes
+        plaintext = fernet.decrypt(ciphertext.encode('utf-8')).decode('utf-8')
+    except Exception:
+        return ciphertext #if decryption fails return the value
+    if digest is not None:
+        decrypt_cache.set(digest, plaintext)
+    return plaintext
+
+
+class DecryptedText(str):
+    """
+    What EncryptedTextField loads: the plaintext, as a real str, plus the ciphertext
+    it was stored as (`_ciphertext`).
+
+    Saving it unchanged writes that ciphertext back instead of re-encrypting. Any
+    str operation (slicing, +, .upper()...) returns a plain str, which is encrypted
+    again on save. It is built when the attribute is first read (see
+    DecryptingAttribute), through decrypt_cache.
+    """
+
+    def __new__(cls, plaintext, ciphertext):
+        value = super().__new__(cls, plaintext)
+        value._ciphertext = ciphertext
+        return value
+
+    @classmethod
+    def from_ciphertext(cls, ciphertext):
+        return cls(decrypt(ciphertext), ciphertext)
+
+    @classmethod
+    def encrypt(cls, plaintext):
+        return cls(plaintext, fernet.encrypt(plaintext.encode('utf-8')).decode('utf-8'))
+
+    def __reduce__(self):
+        # Pickle (e.g. into a cache) the ciphertext, never the plaintext
+        return (DecryptedText.from_ciphertext, (self._ciphertext,))
+
+    # Immutable, copies can share the value
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+class Ciphertext(str):
+    """
+    An already encrypted value, written as is: a loaded token nobody has read yet,
+    or one re-encrypted by rotate_encryption_keys.
+    """
+
+
+class DecryptingAttribute(DeferredAttribute):
+    """
+    Decrypts a loaded Ciphertext the first time the attribute is read, so rows whose
+    value is never looked at (a changelist showing titles, say) are never decrypted.
+    """
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if not isinstance(value, Ciphertext):
+            return value
+        attname = self.field.attname
+        decrypted = DecryptedText.from_ciphertext(value)
+        instance.__dict__[attname] = decrypted
+        # The decrypted value is what was loaded, for TrackedFieldsModel and the blind index
+        loaded = getattr(instance, '_loaded_values', None)
+        if loaded is not None and loaded.get(attname) is value:
+            loaded[attname] = decrypted
+        return decrypted
+
+    def __set__(self, instance, value):
+        # A data descriptor, so __get__ runs even once the value is in __dict__
+        instance.__dict__[self.field.attname] = value
+
+
+def get_raw_value(instance, attname):
+    """The attribute as stored on the instance, without decrypting a loaded Ciphertext."""
+    try:
+        return instance.__dict__[attname]
+    except KeyError:
+        return getattr(instance, attname)
 
-fernet = Fernet(settings.FERNET_KEY)
 
 class EncryptedTextField(models.TextField):
-    """A custom fields that encrypts and decrypts the data"""
+    """
+    A custom fields that encrypts and decrypts the data
+
+    Model instances decrypt on first access. values() / values_list() have no
+    attribute to read and return the stored Ciphertext, decrypt() it if needed.
+    """
+    descriptor_class = DecryptingAttribute
 
     def from_db_value(self, value, expression, connection):
-        """Decrypts the data from the database"""
+        """Keeps the stored token, the descriptor decrypts it when it is read"""
         if value is None:
             return value
-        try:
-            # The value of db is string, needs to be in bytes
-            return fernet.decrypt(value.encode('utf-8')).decode('utf-8')
-        except Exception:
-            return value #if decryption fails return the value
+        # Unread and unchanged, it is written back as is instead of re-encrypted
+        return Ciphertext(value)
     
     def to_python(self, value):
         """Converts the value to a Python object (string)."""
@@ -34,10 +151,31 @@ class EncryptedTextField(models.TextField):
         # from db value handles the encryption
         return str(value)
     
+    def pre_save(self, model_instance, add):
+        """Encrypts a newly assigned value once, keeping its ciphertext on the instance."""
+        value = get_raw_value(model_instance, self.attname)
+        if value is None or isinstance(value, (DecryptedText, Ciphertext)):
+            return value
+        value = str(value)
+        # The same text assigned again (e.g. from a form) keeps the ciphertext it was loaded with
+        loaded = getattr(model_instance, '_loaded_values', {}).get(self.attname)
+        if isinstance(loaded, DecryptedText) and loaded == value:
+            encrypted = loaded
+        else:
+            encrypted = DecryptedText.encrypt(value)
+        # A second save() of the instance then has nothing to encrypt
+        setattr(model_instance, self.attname, encrypted)
+        return encrypted
+
     def get_prep_value(self, value):
         """Encrypts the value before saving it to the database"""
         if value is None:
             return value
+        if isinstance(value, DecryptedText):
+            # Loaded and not replaced: the stored ciphertext is still right
+            return value._ciphertext
+        if isinstance(value, Ciphertext):
+            return str(value)
         # Encrypts the string and get the bytes
         encrypted_bytes = fernet.encrypt(str(value).encode('utf-8'))
         # Return as string to be stored in the text fields
@@ -49,4 +187,163 @@ class EncryptedTextField(models.TextField):
         name, path, args, kwargs = super().deconstruct()
         # No custom arguments to add for this simple field
         return name, path, args, kwargs
-    
\ No newline at end of file
+    
+
+
+def blind_index(value):
+    """Keyed HMAC-SHA256 of a plaintext: equal values match, the value can't be recovered."""
+    key = getattr(settings, 'BLIND_INDEX_KEY', None)
+    if not key:
+        raise ImproperlyConfigured("BLIND_INDEX_KEY is improperly configured")
+    if isinstance(key, str):
+        key = key.encode('utf-8')
+    return hmac.new(key, str(value).encode('utf-8'), hashlib.sha256).hexdigest()
+
+
+class BlindIndexField(models.CharField):
+    """
+    Indexed companion column holding blind_index() of an EncryptedTextField.
+
+        secret_content = EncryptedTextField()
+        secret_content_index = BlindIndexField(source='secret_content')
+
+    It is filled in on every save()/bulk_create(), and lets
+    filter(secret_content=...) / filter(secret_content__in=[...]) seek the index
+    instead of decrypting every row. update() and bulk_update() don't run pre_save(),
+    so the model's manager must be a BlindIndexQuerySet, which fills it in there.
+
+    The digest is left out of forms (editable=False), of DRF serializers with
+    fields='__all__' and of dumpdata (serialize=False), loaddata leaves it empty.
+    """
+
+    def __init__(self, *args, source=None, **kwargs):
+        if source is None:
+            raise ImproperlyConfigured("BlindIndexField needs source='<encrypted field name>'")
+        self.source = source
+        kwargs.setdefault('max_length', 64)
+        kwargs.setdefault('db_index', True)
+        kwargs.setdefault('null', True)
+        kwargs.setdefault('editable', False)
+        kwargs.setdefault('serialize', False)
+        super().__init__(*args, **kwargs)
+
+    def pre_save(self, model_instance, add):
+        attname = model_instance._meta.get_field(self.source).attname
+        value = get_raw_value(model_instance, attname)
+        current = getattr(model_instance, self.attname)
+        loaded = getattr(model_instance, '_loaded_values', {})
+        if current is not None and value is not None and value is loaded.get(attname):
+            # The source is still the value loaded with this index, no need to hash it again
+            return current
+        if isinstance(value, Ciphertext):
+            # Only the plaintext can be hashed
+            value = decrypt(value)
+        index = None if value is None else blind_index(value)
+        setattr(model_instance, self.attname, index)
+        return index
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        kwargs['source'] = self.source
+        for key, default in (
+            ('max_length', 64), ('db_index', True), ('null', True), ('editable', False), ('serialize', False),
+        ):
+            if kwargs.get(key) == default:
+                del kwargs[key]
+        return name, path, args, kwargs
+
+
+def get_blind_index_field(field):
+    """The BlindIndexField whose source is `field`, or None."""
+    for candidate in field.model._meta.concrete_fields:
+        if isinstance(candidate, BlindIndexField) and candidate.source == field.name:
+            return candidate
+    return None
+
+
+def get_blind_index_fields(model):
+    """{source field name: BlindIndexField} for a model."""
+    return {
+        field.source: field for field in model._meta.concrete_fields if isinstance(field, BlindIndexField)
+    }
+
+
+class BlindIndexQuerySet(models.QuerySet):
+    """Keeps BlindIndexFields right in update() and bulk_update(), which skip pre_save()."""
+
+    def update(self, **kwargs):
+        for source, index_field in get_blind_index_fields(self.model).items():
+            # bulk_update() passes both, as CASE expressions it already computed
+            if source in kwargs and index_field.name not in kwargs:
+                kwargs[index_field.name] = self._index_value(kwargs[source])
+        return super().update(**kwargs)
+
+    def bulk_update(self, objs, fields, batch_size=None):
+        objs = list(objs)
+        fields = list(fields)
+        index_fields = get_blind_index_fields(self.model)
+        for name in list(fields):
+            index_field = index_fields.get(name)
+            if index_field is None:
+                continue
+            attname = self.model._meta.get_field(name).attname
+            for obj in objs:
+                setattr(obj, index_field.attname, self._index_value(getattr(obj, attname)))
+            if index_field.name not in fields:
+                fields.append(index_field.name)
+        return super().bulk_update(objs, fields, batch_size=batch_size)
+
+    def _index_value(self, value):
+        if value is None:
+            return None
+        if hasattr(value, 'resolve_expression') or isinstance(value, Ciphertext):
+            # Only a plaintext can be hashed, anything else would leave the index wrong
+            raise FieldError("Fields with a blind index can only be updated with plain values.")
+        return blind_index(value)
+
+
+class BlindIndexLookup(models.Lookup):
+    """
+    Rewrites a lookup on an EncryptedTextField into one on its BlindIndexField.
+
+    The right hand side is never encrypted (prepare_rhs = False): Fernet output
+    is random, so only the HMAC of the plaintext can be compared.
+    """
+    prepare_rhs = False
+
+    def get_index_column(self, compiler, connection):
+        if not isinstance(self.lhs, Col):
+            raise FieldError("Encrypted fields can only be compared as plain columns.")
+        index_field = get_blind_index_field(self.lhs.target)
+        if index_field is None:
+            raise FieldError(
+                f"{self.lhs.target} has no BlindIndexField, its encrypted values can't be compared in SQL."
+            )
+        return compiler.compile(Col(self.lhs.alias, index_field))
+
+    def check_rhs(self, value):
+        if hasattr(value, 'resolve_expression'):
+            raise FieldError("Encrypted fields can only be compared with plain values.")
+        return value
+
+
+@EncryptedTextField.register_lookup
+class BlindIndexExact(BlindIndexLookup):
+    lookup_name = 'exact'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.get_index_column(compiler, connection)
+        return f'{lhs} = %s', (*lhs_params, blind_index(self.check_rhs(self.rhs)))
+
+
+@EncryptedTextField.register_lookup
+class BlindIndexIn(BlindIndexLookup):
+    lookup_name = 'in'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.get_index_column(compiler, connection)
+        indexes = sorted({blind_index(self.check_rhs(value)) for value in self.rhs if value is not None})
+        if not indexes:
+            raise EmptyResultSet
+        placeholders = ', '.join(['%s'] * len(indexes))
+        return f'{lhs} IN ({placeholders})', (*lhs_params, *indexes)
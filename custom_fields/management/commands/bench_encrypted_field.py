@@ -0,0 +1,70 @@
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from custom_fields.fields import decrypt_cache
+from custom_fields.models import SecretNote
+
+class Command(BaseCommand):
+    help = (
+        'Measures SecretNote rows/s: without the decrypt cache, with it (cold and warm), '
+        'loading rows without reading the content, and with defer()'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows', type=int, default=1000,
+            help='Notes to add, keep it within ENCRYPTED_FIELD_CACHE_SIZE for the warm run',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Timing runs, the best one is reported')
+
+    def handle(self, *args, **options):
+        # Everything happens in a transaction that is rolled back, the table is left as it was
+        with transaction.atomic():
+            SecretNote.objects.bulk_create(
+                [SecretNote(title=f"Note {i}", secret_content=f"secret number {i} " * 8) for i in range(options['rows'])],
+                batch_size=500,
+            )
+            # Pre-existing notes are measured too
+            rows = SecretNote.objects.count()
+
+            def read_content():
+                for note in SecretNote.objects.all():
+                    note.secret_content
+
+            def titles_loaded():
+                # The content is loaded but never read, so never decrypted
+                for note in SecretNote.objects.all():
+                    note.title
+
+            def titles_only():
+                for note in SecretNote.objects.defer('secret_content'):
+                    note.title
+
+            maxsize = decrypt_cache.maxsize
+            print(f"\n--- {rows} notes, decrypt cache size {maxsize} ---")
+            if rows > maxsize:
+                print("More notes than the cache holds, the warm run evicts what it needs next")
+            baseline = None
+            for name, func, cache_size, cold in (
+                ('no decrypt cache (before)', read_content, 0, False),
+                ('decrypt cache, cold', read_content, maxsize, True),
+                ('decrypt cache, warm', read_content, maxsize, False),
+                ('loaded, content not read', titles_loaded, maxsize, False),
+                ("defer('secret_content')", titles_only, maxsize, False),
+            ):
+                decrypt_cache.maxsize = cache_size
+                try:
+                    best = min(self.measure(func, cold) for _ in range(options['repeat']))
+                finally:
+                    decrypt_cache.maxsize = maxsize
+                baseline = baseline or best
+                print(f"{name:<32} {rows / best:>12,.0f} rows/s  {baseline / best:6.2f}x")
+
+            transaction.set_rollback(True)
+
+    def measure(self, func, cold):
+        if cold:
+            decrypt_cache.clear()
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
@@ -0,0 +1,136 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import TextField
+from django.db.models.functions import Cast
+from custom_fields import rotation
+from custom_fields.fields import Ciphertext, EncryptedTextField, get_fernet_keys
+
+class Command(BaseCommand):
+    help = 'Re-encrypts every EncryptedTextField value with the first FERNET_KEYS key, resumably and throttled.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows read and written per transaction')
+        parser.add_argument('--workers', type=int, default=1, help='Processes doing the crypto (1 = in this process)')
+        parser.add_argument('--rate', type=float, default=0, help='Target rows/s, 0 = as fast as possible')
+        parser.add_argument('--checkpoint', default='rotate_encryption_keys.json', help='Progress file used to resume')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start over')
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        keys = get_fernet_keys()
+        if len(keys) < 2:
+            print("Only one key configured, every value is already encrypted with it.")
+        self.checkpoint_path = Path(options['checkpoint'])
+        self.checkpoint = self.load_checkpoint(keys[0], options['restart'])
+
+        executor = None
+        if options['workers'] > 1:
+            executor = ProcessPoolExecutor(
+                options['workers'], initializer=rotation.init_worker, initargs=(keys,)
+            )
+        else:
+            rotation.init_worker(keys)
+
+        try:
+            for model, field in self.get_encrypted_fields():
+                self.rotate_field(model, field, executor, options)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+        print("Key rotation complete.")
+
+    def get_encrypted_fields(self):
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, EncryptedTextField):
+                    yield model, field
+
+    def rotate_field(self, model, field, executor, options):
+        label = f"{model._meta.label}.{field.name}"
+        progress = self.checkpoint['fields'].setdefault(
+            label, {'last_pk': None, 'rotated': 0, 'current': 0, 'failed': []}
+        )
+        if progress.get('done'):
+            print(f"{label}: already rotated, skipping.")
+            return
+
+        using = options['database']
+        batch_size = options['batch_size']
+        workers = max(1, options['workers'])
+        manager = model._base_manager.db_manager(using)
+        start = time.monotonic()
+        processed = 0
+
+        while True:
+            with transaction.atomic(using=using):
+                # Keyset by pk: each batch is an index seek, however far in we are
+                queryset = manager.select_for_update().order_by('pk').exclude(**{field.attname: None})
+                if progress['last_pk'] is not None:
+                    queryset = queryset.filter(pk__gt=progress['last_pk'])
+                # Cast to a plain TextField reads the tokens as plain str, the pool workers
+                # unpickle them without importing Django
+                rows = list(queryset.values_list('pk', Cast(field.attname, TextField()))[:batch_size])
+                if not rows:
+                    break
+
+                if executor is None:
+                    results = [rotation.rotate_rows(rows)]
+                else:
+                    chunk = -(-len(rows) // workers)
+                    results = list(executor.map(
+                        rotation.rotate_rows, [rows[i:i + chunk] for i in range(0, len(rows), chunk)]
+                    ))
+
+                updates = []
+                for rotated, current, failed in results:
+                    # Ciphertext goes through get_prep_value as is, no second encryption
+                    updates.extend(model(pk=pk, **{field.attname: Ciphertext(token)}) for pk, token in rotated)
+                    progress['current'] += current
+                    progress['failed'].extend(failed)
+                manager.bulk_update(updates, [field.name], batch_size=500)
+                progress['rotated'] += len(updates)
+                progress['last_pk'] = rows[-1][0]
+
+            # Only after the commit, so a resume never skips unwritten rows
+            self.save_checkpoint()
+            processed += len(rows)
+            rate = processed / max(time.monotonic() - start, 1e-9)
+            print(f"{label}: up to pk {progress['last_pk']}, {progress['rotated']} rotated ({rate:,.0f} rows/s)")
+            if options['rate']:
+                # Sleep off whatever we are ahead of the target rate
+                ahead = processed / options['rate'] - (time.monotonic() - start)
+                if ahead > 0:
+                    time.sleep(ahead)
+
+        progress['done'] = True
+        self.save_checkpoint()
+        if progress['failed']:
+            print(f"{label}: {len(progress['failed'])} values no configured key can decrypt, pks in {self.checkpoint_path}")
+        print(f"{label}: {progress['rotated']} rotated, {progress['current']} already on the primary key.")
+
+    def load_checkpoint(self, primary_key, restart):
+        # Only the key's fingerprint is stored, never the key
+        fingerprint = hashlib.sha256(primary_key if isinstance(primary_key, bytes) else primary_key.encode()).hexdigest()
+        if not restart and self.checkpoint_path.exists():
+            try:
+                checkpoint = json.loads(self.checkpoint_path.read_text())
+            except ValueError:
+                raise CommandError(f"Unreadable checkpoint {self.checkpoint_path}, use --restart.")
+            if checkpoint.get('primary_key') == fingerprint:
+                print(f"Resuming from {self.checkpoint_path}.")
+                return checkpoint
+            print("Checkpoint is for another primary key, starting over.")
+        return {'primary_key': fingerprint, 'fields': {}}
+
+    def save_checkpoint(self):
+        # Write and rename, so a crash mid-write can't leave a truncated file
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        tmp_path.write_text(json.dumps(self.checkpoint, indent=2))
+        os.replace(tmp_path, self.checkpoint_path)
@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:39
+
+import custom_fields.fields
+from django.db import migrations
+
+
+def backfill_blind_index(apps, schema_editor):
+    """Existing notes need their blind index before filter(secret_content=...) finds them."""
+    SecretNote = apps.get_model('custom_fields', 'SecretNote')
+    using = schema_editor.connection.alias
+    batch = []
+    for note in SecretNote.objects.using(using).only('id', 'secret_content').iterator(chunk_size=1000):
+        if note.secret_content is not None:
+            note.secret_content_index = custom_fields.fields.blind_index(note.secret_content)
+            batch.append(note)
+        if len(batch) >= 1000:
+            SecretNote.objects.using(using).bulk_update(batch, ['secret_content_index'])
+            batch = []
+    SecretNote.objects.using(using).bulk_update(batch, ['secret_content_index'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('custom_fields', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='secretnote',
+            name='secret_content_index',
+            field=custom_fields.fields.BlindIndexField(source='secret_content'),
+        ),
+        migrations.RunPython(backfill_blind_index, migrations.RunPython.noop),
+    ]
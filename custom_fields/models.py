@@ -1,10 +1,113 @@
+import copy
 from django.db import models
-from .fields import EncryptedTextField
+from .fields import BlindIndexField, BlindIndexQuerySet, Ciphertext, DecryptedText, EncryptedTextField, get_raw_value
 # Create your models here.
-class SecretNote(models.Model):
+class TrackedFieldsModel(models.Model):
+    """
+    save() writes only the fields that changed since the row was loaded.
+
+    from_db() keeps the loaded values in `_loaded_values`, and a save() without
+    update_fields works them out from it, so editing the title neither rewrites nor
+    re-encrypts a large encrypted column. Values are compared with ==, dicts and
+    lists are copied so in-place edits count. Saving an unchanged instance is a
+    no-op, and like save(update_fields=[]) it sends no signals.
+    """
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.snapshot_loaded_values()
+        return instance
+
+    def snapshot_loaded_values(self, fields=None):
+        """Records the current values of `fields` (default: all loaded) as the stored ones."""
+        if fields is None:
+            self._loaded_values = {}
+            fields = self._meta.concrete_fields
+        else:
+            fields = [self._meta.get_field(name) for name in fields]
+        self._loaded_values.update(
+            (field.attname, _copy_mutable(self.__dict__[field.attname]))
+            for field in fields if field.attname in self.__dict__
+        )
+
+    def get_changed_fields(self):
+        """Names of the fields whose value differs from the loaded one, or that were deferred and then set."""
+        loaded = self._loaded_values
+        changed = []
+        for field in self._meta.concrete_fields:
+            if isinstance(field, BlindIndexField):
+                continue
+            if field.attname not in loaded:
+                # Deferred: assigning it is a change, like Django's own deferred-save path
+                if field.attname in self.__dict__:
+                    changed.append(field.name)
+                continue
+            # Reading an encrypted value that was never read would decrypt it
+            value = get_raw_value(self, field.attname)
+            original = loaded[field.attname]
+            if value is original and not isinstance(value, (dict, list)):
+                continue
+            if isinstance(original, Ciphertext) and not isinstance(value, Ciphertext):
+                # Loaded unread and then replaced: compare with the plaintext
+                original = loaded[field.attname] = DecryptedText.from_ciphertext(original)
+            if value != original:
+                changed.append(field.name)
+            elif isinstance(original, DecryptedText):
+                # Equal text assigned again: put the loaded value back, with its ciphertext
+                setattr(self, field.attname, original)
+        # An index is rewritten with its source, and only then
+        changed.extend(
+            field.name for field in self._meta.concrete_fields
+            if isinstance(field, BlindIndexField) and field.source in changed
+        )
+        if changed:
+            # A real save bumps the auto_now timestamps, as a full save() would
+            changed.extend(
+                field.name for field in self._meta.concrete_fields
+                if getattr(field, 'auto_now', False) and field.name not in changed
+            )
+        return changed
+
+    def save(self, *args, force_insert=False, force_update=False, using=None, update_fields=None):
+        if (update_fields is None and not force_insert and not self._state.adding
+                and hasattr(self, '_loaded_values') and (using is None or using == self._state.db)
+                and self._loaded_values.get(self._meta.pk.attname, self.pk) == self.pk):
+            # A changed pk is a copy to a new row, that still needs the full INSERT
+            update_fields = self.get_changed_fields()
+        super().save(
+            *args, force_insert=force_insert, force_update=force_update, using=using,
+            update_fields=update_fields,
+        )
+        if update_fields is None or not hasattr(self, '_loaded_values'):
+            self.snapshot_loaded_values()
+        else:
+            # Fields left out of update_fields still hold unsaved changes
+            self.snapshot_loaded_values(update_fields)
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
+        if fields is None or not hasattr(self, '_loaded_values'):
+            self.snapshot_loaded_values()
+        else:
+            self.snapshot_loaded_values(fields)
+
+
+def _copy_mutable(value):
+    return copy.deepcopy(value) if isinstance(value, (dict, list)) else value
+
+
+class SecretNote(TrackedFieldsModel):
     title = models.CharField(max_length=30)
     secret_content = EncryptedTextField()
+    # HMAC of secret_content, so filter(secret_content=...) is an index seek
+    secret_content_index = BlindIndexField(source='secret_content')
+
+    # update() / bulk_update() keep secret_content_index in step too
+    objects = BlindIndexQuerySet.as_manager()
 
     def __str__(self):
         return self.title
-
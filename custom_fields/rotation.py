@@ -0,0 +1,39 @@
+# custom_fields/rotation.py
+# Crypto side of rotate_encryption_keys. Nothing here imports Django, so the
+# process pool workers start fast and don't need settings.
+from cryptography.fernet import Fernet, InvalidToken, MultiFernet
+
+_primary = None
+_fernet = None
+
+def init_worker(keys):
+    """Pool initializer: builds the Fernet objects once per worker."""
+    global _primary, _fernet
+    _primary = Fernet(keys[0])
+    _fernet = MultiFernet([Fernet(key) for key in keys])
+
+def rotate_rows(rows):
+    """
+    Re-encrypts (pk, ciphertext) rows with the primary key.
+
+    Returns (rotated [(pk, new ciphertext)], current count, failed pks). Rows the
+    primary key already decrypts are left alone, so a resumed or repeated run only
+    rewrites what still needs it. The token timestamps are kept.
+    """
+    rotated = []
+    current = 0
+    failed = []
+    for pk, ciphertext in rows:
+        token = ciphertext.encode('utf-8')
+        try:
+            _primary.decrypt(token)
+            current += 1
+            continue
+        except InvalidToken:
+            pass
+        try:
+            rotated.append((pk, _fernet.rotate(token).decode('utf-8')))
+        except InvalidToken:
+            # Not readable with any configured key (or never encrypted)
+            failed.append(pk)
+    return rotated, current, failed
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class DrfInternalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'drf_internals'
+
+    def ready(self):
+        from . import signals
+        from .tenancy import register_tenant_databases
+        # Tenant aliases exist from startup, for requests and `--database tenant_<id>` alike
+        register_tenant_databases()
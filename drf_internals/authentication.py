@@ -0,0 +1,62 @@
+# drf_internals/authentication.py
+import hashlib
+import time
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from .cache import LRUCache
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that remembers tokens it has already verified.
+
+    The first request with a token pays for the signature check and the User
+    query. Later requests with the same token are one dict lookup: the cache is
+    keyed by the token's SHA-256, and the user is rebuilt from a few cached
+    columns without a query (other columns load lazily if something reads them).
+
+    An entry lives until the token's `exp` or `max_age` seconds, whichever is
+    first. So deactivating a user or changing their password takes effect within
+    `max_age` rather than the full ACCESS_TOKEN_LIFETIME.
+    """
+    cache_size = 10_000
+    max_age = 60
+    snapshot_fields = ('is_active', 'is_staff', 'is_superuser')
+
+    # token digest -> (expires_at, validated token, user snapshot), shared by every
+    # instance in the process (DRF builds one per request)
+    token_cache = LRUCache(cache_size)
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        key = hashlib.sha256(raw_token).digest()
+        now = time.time()
+        entry = self.token_cache.get(key)
+        if entry is not None:
+            expires_at, validated_token, snapshot = entry
+            if expires_at > now:
+                return self.user_from_snapshot(snapshot), validated_token
+            self.token_cache.delete(key)
+
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_user(validated_token)
+
+        expires_at = min(validated_token['exp'], now + self.max_age)
+        self.token_cache.set(key, (expires_at, validated_token, self.take_snapshot(user)))
+        return user, validated_token
+
+    def take_snapshot(self, user):
+        model = type(user)
+        wanted = {model._meta.pk.name, model.USERNAME_FIELD, *self.snapshot_fields}
+        field_names = [f.attname for f in model._meta.concrete_fields if f.name in wanted]
+        return model, user._state.db, field_names, tuple(getattr(user, name) for name in field_names)
+
+    def user_from_snapshot(self, snapshot):
+        model, db, field_names, values = snapshot
+        # Same as a row loaded with .only(*field_names)
+        return model.from_db(db, field_names, values)
@@ -0,0 +1,81 @@
+# drf_internals/cache.py
+import threading
+import time
+from collections import OrderedDict
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+ARTICLE_GENERATION_KEY = 'article_generation'
+# Longest entry lifetime on a per-process cache, see get_cache_timeout()
+LOCAL_CACHE_TIMEOUT = 60
+
+def get_article_generation():
+    """
+    Returns the current generation of the article data.
+
+    The generation is part of every article cache key, so bumping it makes all old
+    entries unreachable at once (they simply age out). It is seeded from the clock
+    rather than 1, so if the counter itself is evicted the new value can never collide
+    with a generation that old entries were stored under.
+    """
+    generation = cache.get(ARTICLE_GENERATION_KEY)
+    if generation is None:
+        cache.add(ARTICLE_GENERATION_KEY, time.time_ns(), timeout=None)
+        generation = cache.get(ARTICLE_GENERATION_KEY)
+    return generation
+
+def bump_article_generation():
+    """Invalidates every cached article response."""
+    try:
+        return cache.incr(ARTICLE_GENERATION_KEY)
+    except ValueError:
+        # Key is missing, a fresh seed is just as good as an increment
+        cache.set(ARTICLE_GENERATION_KEY, time.time_ns(), timeout=None)
+
+def is_shared_cache(alias='default'):
+    """False for backends that live inside one process (locmem, dummy)."""
+    return not isinstance(caches[alias], (LocMemCache, DummyCache))
+
+def get_cache_timeout(timeout, alias='default'):
+    """
+    `timeout` on a shared cache, at most LOCAL_CACHE_TIMEOUT on a per-process one.
+
+    Generations and table versions only invalidate entries in the cache they are
+    bumped in. With LocMemCache a write in one worker is invisible to the others,
+    so there only the timeout bounds how stale they can get.
+    """
+    if is_shared_cache(alias):
+        return timeout
+    return min(timeout, LOCAL_CACHE_TIMEOUT)
+
+
+class LRUCache:
+    """A thread-safe, bounded, per-process LRU. A maxsize of 0 keeps nothing."""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        with self.lock:
+            value = self.entries.get(key)
+            if value is not None:
+                self.entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def delete(self, key):
+        with self.lock:
+            self.entries.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
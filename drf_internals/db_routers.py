@@ -0,0 +1,76 @@
+# drf_internals/db_routers.py
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from .replication import get_replica_alias, get_replica_lag, primary_pinned, replica_reads_allowed
+from .tenancy import current_tenant_db, is_tenant_alias
+
+class TenantRouter:
+    """
+    Sends the tenant apps' models to the current tenant's database.
+
+    The alias comes from TenantDatabaseMiddleware; outside a tenant URL every
+    method returns None and the next router (or `default`) decides.
+    """
+    tenant_app_labels = {'orm_internals'}
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in self.tenant_app_labels:
+            return current_tenant_db.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label in self.tenant_app_labels:
+            return current_tenant_db.get()
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Tenant databases only hold the tenant apps' tables
+        if is_tenant_alias(db):
+            return app_label in self.tenant_app_labels
+        return None
+
+
+class ReplicaRouter:
+    """
+    Sends reads to the read replica when ReplicaRoutingMiddleware allows it.
+
+    Writes always go to the primary, and pin the rest of the request (and, through
+    a cookie, the client's next few seconds) to it, so users read their own writes.
+    Auth, sessions and the token blacklist never read from the replica, and neither
+    does anything while the replica lags more than REPLICA_MAX_LAG seconds.
+    """
+    primary_only_app_labels = {'auth', 'sessions', 'contenttypes', 'token_blacklist'}
+
+    def db_for_read(self, model, **hints):
+        replica = get_replica_alias()
+        if replica is None or not replica_reads_allowed.get() or primary_pinned.get():
+            return None
+        if model._meta.app_label in self.primary_only_app_labels:
+            return None
+        if get_replica_lag(replica) > settings.REPLICA_MAX_LAG:
+            return None
+        return replica
+
+    def db_for_write(self, model, **hints):
+        replica = get_replica_alias()
+        if replica is None:
+            return None
+        primary_pinned.set(True)
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db == replica:
+            # Django would otherwise save an object back to the database it came from
+            return DEFAULT_DB_ALIAS
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Same data on both sides, so objects read from either can be related
+        same_data = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in same_data and obj2._state.db in same_data:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets the schema with the data, from sync_replica
+        if db == get_replica_alias():
+            return False
+        return None
@@ -0,0 +1,136 @@
+# drf_internals/denylist.py
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+from rest_framework_simplejwt.tokens import RefreshToken
+
+class BloomFilter:
+    """A fixed size Bloom filter: no false negatives, `error_rate` false positives."""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Double hashing: k positions from one 128 bit digest
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hash_count)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+
+class JTIDenylist:
+    """
+    Per-process copy of the simplejwt blacklist.
+
+    A Bloom filter holds every blacklisted, unexpired JTI, and an LRU set holds the
+    most recent ones exactly. Most tokens are not blacklisted, so most checks end at
+    the Bloom filter with no query at all. Only a Bloom hit on an old JTI falls back
+    to the database.
+
+    New rows are pulled incrementally (BlacklistedToken.id > watermark) at most every
+    `sync_interval` seconds. A token blacklisted by another process can therefore
+    still pass here for up to that long.
+    """
+
+    def __init__(self, capacity=100_000, recent_size=10_000, sync_interval=5.0):
+        self.capacity = capacity
+        self.recent_size = recent_size
+        self.sync_interval = sync_interval
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.recent = OrderedDict()
+        self.watermark = 0
+        self.last_sync = 0.0
+
+    def is_denied(self, jti):
+        self.sync()
+        if jti not in self.bloom:
+            return False
+        if jti in self.recent:
+            return True
+        # Bloom hit on something we don't hold exactly: either an older entry or a false positive
+        return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+    def add(self, jti):
+        """Records a JTI this process just blacklisted, without waiting for the next sync."""
+        self.sync()
+        with self.lock:
+            self._remember(jti)
+
+    def sync(self, force=False):
+        # Nothing loaded yet is always due, whatever the clock says (monotonic() can be small after boot)
+        if not force and self.bloom is not None and time.monotonic() - self.last_sync < self.sync_interval:
+            return
+        with self.lock:
+            if self.bloom is None or self.bloom.count >= self.bloom.capacity:
+                self._load()
+            else:
+                rows = BlacklistedToken.objects.filter(id__gt=self.watermark).order_by('id').values_list(
+                    'id', 'token__jti'
+                )
+                for row_id, jti in rows:
+                    self._remember(jti)
+                    self.watermark = row_id
+            self.last_sync = time.monotonic()
+
+    def _load(self):
+        """Full load of the unexpired blacklist, also used to grow a full Bloom filter."""
+        # Take the watermark first, so rows added during the load are picked up by the next sync
+        watermark = BlacklistedToken.objects.aggregate(newest=Max('id'))['newest'] or 0
+        jtis = list(BlacklistedToken.objects.filter(
+            id__lte=watermark, token__expires_at__gt=timezone.now()
+        ).order_by('id').values_list('token__jti', flat=True))
+
+        capacity = self.capacity
+        while capacity < len(jtis) * 2:
+            capacity *= 2
+        self.capacity = capacity
+        self.bloom = BloomFilter(capacity)
+        self.recent = OrderedDict()
+        for jti in jtis:
+            self._remember(jti)
+        self.watermark = watermark
+
+    def _remember(self, jti):
+        self.bloom.add(jti)
+        self.recent[jti] = None
+        self.recent.move_to_end(jti)
+        if len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+
+
+denylist = JTIDenylist()
+
+
+class DenylistRefreshToken(RefreshToken):
+    """A RefreshToken that checks the in-memory denylist instead of querying every time."""
+
+    def check_blacklist(self):
+        jti = self.payload[api_settings.JTI_CLAIM]
+        if denylist.is_denied(jti):
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self):
+        result = super().blacklist()
+        denylist.add(self.payload[api_settings.JTI_CLAIM])
+        return result
@@ -0,0 +1,31 @@
+# drf_internals/filters.py
+from rest_framework.filters import BaseFilterBackend
+from orm_internals.search import search_articles
+
+class ArticleSearchFilter(BaseFilterBackend):
+    """
+    ?search=djan que: articles whose title or author name has words starting with
+    every term, best match first, through the FTS5 index (see orm_internals/search.py).
+
+    The queryset gets a `search_rank` annotation, so keyset pagination can seek on
+    ('search_rank', 'id') while searching.
+    """
+    search_param = 'search'
+
+    def get_search_text(self, request):
+        return request.query_params.get(self.search_param, '').strip()
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+        return search_articles(queryset, text)
+
+    def get_schema_operation_parameters(self, view):
+        return [{
+            'name': self.search_param,
+            'required': False,
+            'in': 'query',
+            'description': 'Prefix search on article title and author name.',
+            'schema': {'type': 'string'},
+        }]
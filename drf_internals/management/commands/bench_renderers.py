@@ -0,0 +1,41 @@
+import timeit
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from drf_internals.optimizers import optimize_queryset
+from drf_internals.renderers import MessagePackRenderer, ORJSONRenderer
+from drf_internals.serializers import GoodArticleSerializer
+from orm_internals.models import Article
+
+class Command(BaseCommand):
+    help = 'Compares render time and payload size of the API renderers on GoodArticleSerializer data'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000)
+        parser.add_argument('--number', type=int, default=50, help='Renders per timing run')
+        parser.add_argument('--repeat', type=int, default=5, help='Timing runs, the best one is reported')
+
+    def handle(self, *args, **options):
+        serializer = GoodArticleSerializer()
+        queryset = optimize_queryset(Article.objects.all(), serializer)[:options['rows']]
+        payload = GoodArticleSerializer(queryset, many=True).data
+        if not payload:
+            print("No articles found, populate the database first (populate_articles).")
+            return
+
+        renderers = [('JSONRenderer (stdlib json)', JSONRenderer())]
+        for name, renderer_class in (('ORJSONRenderer', ORJSONRenderer), ('MessagePackRenderer', MessagePackRenderer)):
+            if renderer_class.is_available():
+                renderers.append((name, renderer_class()))
+            else:
+                print(f"Skipping {name}: package not installed.")
+
+        print(f"\n--- Rendering {len(payload)} articles ---")
+        baseline = None
+        for name, renderer in renderers:
+            body = renderer.render(payload, renderer.media_type)
+            best = min(timeit.repeat(
+                lambda: renderer.render(payload, renderer.media_type),
+                number=options['number'], repeat=options['repeat'],
+            )) / options['number']
+            baseline = baseline or best
+            print(f"{name:<28} {best * 1000:8.3f} ms  {len(body):>10} bytes  {baseline / best:5.2f}x")
@@ -0,0 +1,24 @@
+# drf_internals/management/commands/migrate_tenants.py
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from drf_internals.tenancy import TENANT_ID_RE, get_tenant_db_path, get_tenant_ids, register_tenant_database
+
+class Command(BaseCommand):
+    help = 'Creates and migrates the given tenant databases, or migrates every existing tenant.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('tenant_ids', nargs='*', help='Tenants to create/migrate (default: all existing ones)')
+
+    def handle(self, *args, **options):
+        tenant_ids = options['tenant_ids'] or get_tenant_ids()
+        invalid = [tenant_id for tenant_id in tenant_ids if not TENANT_ID_RE.match(tenant_id)]
+        if invalid:
+            raise CommandError(f"Invalid tenant ids: {', '.join(invalid)}")
+
+        for tenant_id in tenant_ids:
+            path = get_tenant_db_path(tenant_id)
+            is_new = not path.exists()
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # TenantRouter.allow_migrate limits this to the tenant apps
+            call_command('migrate', database=register_tenant_database(tenant_id), verbosity=0, interactive=False)
+            print(f"{'Created' if is_new else 'Migrated'} tenant {tenant_id}.")
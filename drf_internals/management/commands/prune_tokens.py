@@ -0,0 +1,34 @@
+import time
+from django.core.management.base import BaseCommand
+from rest_framework_simplejwt.token_blacklist.models import OutstandingToken
+from rest_framework_simplejwt.utils import aware_utcnow
+
+class Command(BaseCommand):
+    help = 'Deletes expired outstanding (and blacklisted) tokens in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--sleep', type=float, default=0.0,
+                            help='Seconds to pause between batches to keep write locks short')
+
+    def handle(self, *args, **options):
+        # Unlike flushexpiredtokens (one big DELETE), each batch is its own short
+        # statement, so other writers aren't blocked for the whole run
+        batch_size = options['batch_size']
+        now = aware_utcnow()
+        total = 0
+        start = time.time()
+        while True:
+            ids = list(
+                OutstandingToken.objects.filter(expires_at__lte=now)
+                .order_by('id').values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            # Cascades to the matching BlacklistedToken rows
+            OutstandingToken.objects.filter(id__in=ids).delete()
+            total += len(ids)
+            print(f"Deleted {total} expired tokens so far...")
+            if options['sleep']:
+                time.sleep(options['sleep'])
+        print(f"Pruned {total} expired tokens in {time.time() - start:.2f}s")
@@ -0,0 +1,40 @@
+# drf_internals/management/commands/sync_replica.py
+import sqlite3
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from drf_internals.replication import get_replica_alias
+
+class Command(BaseCommand):
+    help = 'Copies the primary SQLite database onto the read replica file (once, or every --interval seconds).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=0, help='Keep syncing every N seconds (0 = once)')
+        parser.add_argument('--pages', type=int, default=1024, help='Pages copied per step, readers get the lock in between')
+
+    def handle(self, *args, **options):
+        replica = get_replica_alias()
+        if replica is None:
+            raise CommandError("No REPLICA_DATABASE configured.")
+        primary_settings = connections.settings['default']
+        replica_settings = connections.settings[replica]
+        if 'sqlite3' not in primary_settings['ENGINE'] or 'sqlite3' not in replica_settings['ENGINE']:
+            raise CommandError("sync_replica only copies SQLite files, use the database's own replication elsewhere.")
+
+        while True:
+            start = time.time()
+            self.copy(str(primary_settings['NAME']), str(replica_settings['NAME']), options['pages'])
+            print(f"Replica synced in {time.time() - start:.2f}s.")
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
+
+    def copy(self, primary_path, replica_path, pages):
+        # The online backup API gives a consistent snapshot even while the primary is written to
+        source = sqlite3.connect(primary_path)
+        target = sqlite3.connect(replica_path)
+        try:
+            source.backup(target, pages=pages, sleep=0.005)
+        finally:
+            target.close()
+            source.close()
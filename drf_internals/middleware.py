@@ -0,0 +1,83 @@
+# drf_internals/middleware.py
+from django.conf import settings
+from django.http import Http404
+from .replication import primary_pinned, replica_reads_allowed
+from .tenancy import TENANT_ID_RE, close_evicted_connections, current_tenant_db, get_tenant_alias
+
+class TenantDatabaseMiddleware:
+    """Points TenantRouter at the database of the URL's <tenant_id> for this request."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = current_tenant_db.set(None)
+        try:
+            return self.get_response(request)
+        finally:
+            current_tenant_db.reset(token)
+            close_evicted_connections()
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        tenant_id = view_kwargs.get('tenant_id')
+        if tenant_id is None:
+            return None
+        if not TENANT_ID_RE.match(tenant_id):
+            raise Http404("Unknown tenant")
+        try:
+            current_tenant_db.set(get_tenant_alias(tenant_id))
+        except LookupError:
+            # Tenants are provisioned with migrate_tenants, not by visiting a URL
+            raise Http404("Unknown tenant")
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Lets ReplicaRouter send this request's reads to the replica when it's a GET/HEAD
+    to an admin changelist or other read-only admin page, a DRF `list` action or a
+    view with `use_replica = True` (heavy admin filters and exports then can't slow
+    the primary down). Admin add/change/delete forms stay on the primary, they load
+    the row that is about to be written.
+
+    A write pins the rest of the request to the primary, and the pin cookie keeps
+    the client there for REPLICA_STICKY_SECONDS so it reads its own writes.
+    """
+    pin_cookie_name = 'primary_pin'
+    # url_name suffixes of the admin pages that only read
+    admin_read_only_views = ('index', 'app_list', '_changelist', '_history', 'autocomplete')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        cookie_pinned = self.pin_cookie_name in request.COOKIES
+        allowed_token = replica_reads_allowed.set(False)
+        pinned_token = primary_pinned.set(cookie_pinned)
+        try:
+            response = self.get_response(request)
+            if primary_pinned.get() and not cookie_pinned:
+                response.set_cookie(
+                    self.pin_cookie_name, '1', max_age=settings.REPLICA_STICKY_SECONDS,
+                    httponly=True, samesite='Lax',
+                )
+            return response
+        finally:
+            replica_reads_allowed.reset(allowed_token)
+            primary_pinned.reset(pinned_token)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method in ('GET', 'HEAD') and self.may_use_replica(request, view_func):
+            replica_reads_allowed.set(True)
+        return None
+
+    def may_use_replica(self, request, view_func):
+        match = request.resolver_match
+        if match is not None and match.app_name == 'admin':
+            return (match.url_name or '').endswith(self.admin_read_only_views)
+        # DRF's as_view() keeps the class (and, for viewsets, the method -> action map)
+        view_class = getattr(view_func, 'cls', None) or getattr(view_func, 'view_class', None)
+        if getattr(view_class, 'use_replica', False):
+            return True
+        actions = getattr(view_func, 'actions', None) or {}
+        return actions.get(request.method.lower()) == 'list'
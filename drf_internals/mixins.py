@@ -0,0 +1,106 @@
+# drf_internals/mixins.py
+from rest_framework.response import Response
+from orm_internals.counters import view_counter
+from .optimizers import optimize_queryset
+from .pagination import KeysetPagination
+from .values import get_values_plan
+
+class QueryOptimizerMixin:
+    """
+    Derives select_related/prefetch_related/only() from the serializer's fields.
+
+    Nested serializers on a FK become a JOIN, nested or PK serializers on M2M/reverse
+    relations become a prefetch, and fields listed in the serializer's
+    `Meta.annotations` (e.g. {'tag_count': Count('tags')}) are annotated. So the
+    number of queries stays constant however many rows the page has.
+    """
+
+    def get_queryset(self):
+        return optimize_queryset(self.get_base_queryset(), self.get_serializer())
+
+    def get_base_queryset(self):
+        """The view's queryset before the serializer's joins and annotations."""
+        return super().get_queryset()
+
+    def get_keyset_queryset(self):
+        """Filtered rows without joins or GROUP BY, for KeysetPagination to seek on."""
+        return self.filter_queryset(self.get_base_queryset())
+
+
+class ValuesListMixin:
+    """
+    Serves list() straight from values_list() rows when the serializer allows it.
+
+    The serializer is compiled once into a flat projection and a row -> dict function
+    (see values.py), so no model instances are built and no per-field
+    to_representation dispatch happens. Serializers that can't be compiled fall back
+    to the regular list().
+    """
+
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        plan = get_values_plan(serializer, queryset.model)
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+
+        # Make sure annotation-backed fields exist even without QueryOptimizerMixin
+        queryset = optimize_queryset(queryset, serializer)
+        to_dict = plan.to_dict
+
+        if isinstance(self.paginator, KeysetPagination):
+            # The cursor needs the ordering values too, fetch them as extra columns
+            return self.keyset_list(queryset, plan)
+
+        rows = queryset.values_list(*plan.columns)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response([to_dict(row) for row in page])
+        return Response([to_dict(row) for row in rows])
+
+    def keyset_list(self, queryset, plan):
+        paginator = self.paginator
+        keys = paginator.paginate_keys(queryset, self.request, view=self)
+        if keys is not None:
+            # Only the page's rows go through the joins and the GROUP BY
+            columns = list(plan.columns)
+            if 'pk' not in columns:
+                columns.append('pk')
+            pk_index = columns.index('pk')
+            rows = {row[pk_index]: row for row in queryset.filter(pk__in=[key[-1] for key in keys])
+                    .order_by().values_list(*columns)}
+            to_dict = plan.to_dict
+            return paginator.get_paginated_response(
+                [to_dict(rows[key[-1]]) for key in keys if key[-1] in rows]
+            )
+
+        queryset = paginator.seek(queryset, self.request, view=self)
+        columns = list(plan.columns)
+        positions = []
+        for name in paginator.get_position_fields():
+            if name not in columns:
+                columns.append(name)
+            positions.append(columns.index(name))
+
+        rows = queryset.values_list(*columns)
+        page = paginator.paginate_rows(rows, lambda row: [row[i] for i in positions])
+        to_dict = plan.to_dict
+        return paginator.get_paginated_response([to_dict(row) for row in page])
+
+
+class CountViewsMixin:
+    """
+    retrieve() counts a view through the buffered view_counter, so a hit costs no
+    UPDATE. With `merge_pending_views` the response's `views` (when the serializer
+    has one) includes the counts that haven't been flushed yet.
+    """
+    merge_pending_views = True
+
+    def retrieve(self, request, *args, **kwargs):
+        instance = self.get_object()
+        using = instance._state.db
+        view_counter.incr(instance.pk, using=using)
+        data = self.get_serializer(instance).data
+        if self.merge_pending_views and 'views' in data:
+            data['views'] += view_counter.get_pending(instance.pk, using=using)
+        return Response(data)
@@ -0,0 +1,177 @@
+# drf_internals/optimizers.py
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Prefetch
+from rest_framework import serializers
+
+class QueryPlan:
+    """What a serializer needs from the database, collected once per field set."""
+
+    def __init__(self):
+        self.select_related = []
+        self.prefetch_related = {}  # path -> QueryPlan of the prefetched model (or None)
+        self.annotations = {}
+        # None means "can't tell which columns are read", so nothing gets deferred
+        self.only = []
+
+    def defer_nothing(self):
+        self.only = None
+
+    def add_only(self, path):
+        if self.only is not None and path not in self.only:
+            self.only.append(path)
+
+
+# (serializer class, readable field names) -> QueryPlan
+_plan_cache = {}
+
+def get_query_plan(serializer, model):
+    """Returns the (cached) QueryPlan for a serializer instance."""
+    key = (type(serializer), model, tuple(_readable_fields(serializer)))
+    plan = _plan_cache.get(key)
+    if plan is None:
+        plan = QueryPlan()
+        _walk(serializer, model, '', plan)
+        _plan_cache[key] = plan
+    return plan
+
+def optimize_queryset(queryset, serializer):
+    """Applies the select_related/prefetch_related/annotate/only a serializer needs."""
+    return apply_query_plan(queryset, get_query_plan(serializer, queryset.model))
+
+def apply_query_plan(queryset, plan):
+    if plan.select_related:
+        queryset = queryset.select_related(*plan.select_related)
+
+    # Don't fight lookups the view already set up by hand
+    seen = {getattr(lookup, 'prefetch_to', lookup) for lookup in queryset._prefetch_related_lookups}
+    prefetches = []
+    for path, child_plan in plan.prefetch_related.items():
+        if path in seen:
+            continue
+        if child_plan is None:
+            prefetches.append(path)
+        else:
+            related_model = _related_model(queryset.model, path)
+            prefetches.append(Prefetch(
+                path, queryset=apply_query_plan(related_model._default_manager.all(), child_plan)
+            ))
+    if prefetches:
+        queryset = queryset.prefetch_related(*prefetches)
+
+    annotations = {
+        name: expression for name, expression in plan.annotations.items()
+        if name not in queryset.query.annotations
+    }
+    if annotations:
+        queryset = queryset.annotate(**annotations)
+
+    if plan.only:
+        queryset = queryset.only(*plan.only)
+    return queryset
+
+def _readable_fields(serializer):
+    return [name for name, field in serializer.fields.items() if not field.write_only]
+
+def _get_model_field(model, attr):
+    """Like _meta.get_field(), but also accepts reverse accessor names (article_set)."""
+    try:
+        return model._meta.get_field(attr)
+    except FieldDoesNotExist:
+        for relation in model._meta.related_objects:
+            if relation.get_accessor_name() == attr:
+                return relation
+        raise
+
+def _related_model(model, path):
+    for name in path.split('__'):
+        model = _get_model_field(model, name).related_model
+    return model
+
+def _walk(serializer, model, prefix, plan):
+    """
+    Collects the query needs of `serializer` into `plan`.
+
+    `prefix` is the select_related path from the plan's root model, so a nested
+    AuthorSerializer on `author` adds `author__name` and not `name`.
+    """
+    # Annotations can only be added on the root of a queryset, not through a join
+    annotations = getattr(getattr(serializer, 'Meta', None), 'annotations', {})
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+
+        if not prefix and field.field_name in annotations:
+            plan.annotations[field.field_name] = annotations[field.field_name]
+            continue
+
+        if isinstance(field, serializers.SerializerMethodField):
+            # A method can touch any attribute, so we can't defer anything safely
+            plan.defer_nothing()
+            continue
+
+        if field.source == '*':
+            if isinstance(field, serializers.BaseSerializer):
+                _walk(field, model, prefix, plan)
+            else:
+                plan.defer_nothing()
+            continue
+
+        _walk_source(field, model, prefix, plan)
+
+def _walk_source(field, model, prefix, plan):
+    current = model
+    attrs = field.source_attrs
+    for i, attr in enumerate(attrs):
+        path = prefix + '__'.join(attrs[:i + 1])
+        is_last = i == len(attrs) - 1
+        try:
+            model_field = _get_model_field(current, attr)
+        except FieldDoesNotExist:
+            # A property or method, it may read anything
+            plan.defer_nothing()
+            return
+
+        if not model_field.is_relation:
+            plan.add_only(path)
+            return
+
+        if model_field.many_to_many or model_field.one_to_many:
+            child_plan = None
+            child = getattr(field, 'child', None)
+            if is_last and isinstance(child, serializers.BaseSerializer):
+                # The prefetched queryset gets its own plan, annotations included
+                child_plan = QueryPlan()
+                _walk(child, model_field.related_model, '', child_plan)
+                if model_field.one_to_many:
+                    # Django matches prefetched rows back to their parent through the FK
+                    child_plan.add_only(model_field.field.name)
+            # Prefetch lookups can run through the select_related joins (author__article_set)
+            if plan.prefetch_related.get(path) is None:
+                plan.prefetch_related[path] = child_plan
+            return
+
+        # Forward or reverse FK / one-to-one
+        if not model_field.concrete:
+            # Reverse one-to-one, only() can't name it
+            plan.defer_nothing()
+
+        if not is_last:
+            if path not in plan.select_related:
+                plan.select_related.append(path)
+            current = model_field.related_model
+            continue
+
+        if isinstance(field, serializers.BaseSerializer):
+            if path not in plan.select_related:
+                plan.select_related.append(path)
+            _walk(field, model_field.related_model, path + '__', plan)
+        elif isinstance(field, serializers.PrimaryKeyRelatedField):
+            # Only the FK column is needed, no join
+            plan.add_only(path)
+        else:
+            # e.g. StringRelatedField: str(obj) may read any column of the related row
+            if path not in plan.select_related:
+                plan.select_related.append(path)
+            plan.defer_nothing()
+        return
@@ -0,0 +1,197 @@
+# drf_internals/pagination.py
+import hashlib
+import json
+import math
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+class KeysetPagination(BasePagination):
+    """
+    Forward-only keyset (seek) pagination.
+
+    The cursor is the ordering values of the last row, and the next page is fetched
+    with `WHERE (views, id) < (cursor)` instead of OFFSET, so with an index on the
+    ordering columns page 10,000 costs the same as page 1. There is no COUNT(*):
+    a total is only added with ?count=1, and then it is a cached, approximate one.
+
+    Views can override the ordering with a `keyset_ordering` attribute. The last
+    field must be unique (usually the pk) so the ordering is total.
+
+    Views can also provide `get_keyset_queryset()`: the same rows without the joins
+    and aggregates the serializer needs. The seek and LIMIT then run on it alone,
+    which the index answers without a GROUP BY or a sort, and only the page's rows
+    are loaded from the full queryset.
+    """
+    page_size = 50
+    max_page_size = 500
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    ordering = ('-views', '-id')
+    count_cache_timeout = 60 * 5
+    invalid_cursor_message = 'Invalid cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        keys = self.paginate_keys(queryset, request, view)
+        if keys is not None:
+            objects = queryset.in_bulk([key[-1] for key in keys])
+            return [objects[key[-1]] for key in keys if key[-1] in objects]
+
+        queryset = self.seek(queryset, request, view)
+        fields = self.get_position_fields()
+        return self.paginate_rows(queryset, lambda obj: [getattr(obj, name) for name in fields])
+
+    def paginate_keys(self, queryset, request, view=None):
+        """
+        Takes one page of positions from the view's keyset queryset, or returns None
+        when there is none (or the ordering doesn't end with the pk). The last value
+        of each position is the row's pk.
+        """
+        get_keyset_queryset = getattr(view, 'get_keyset_queryset', None)
+        last = tuple(getattr(view, 'keyset_ordering', self.ordering))[-1].lstrip('-')
+        if get_keyset_queryset is None or last not in ('pk', queryset.model._meta.pk.name):
+            return None
+        keys = self.seek(get_keyset_queryset(), request, view)
+        return self.paginate_rows(keys.values_list(*self.get_position_fields()), list)
+
+    def seek(self, queryset, request, view=None):
+        """Applies the ordering and the cursor's WHERE clause, but not the LIMIT."""
+        self.request = request
+        self.view = view
+        self.ordering = tuple(getattr(view, 'keyset_ordering', self.ordering))
+        self.page_size = self.get_page_size(request)
+        self.count = self.get_count(queryset) if request.query_params.get(self.count_query_param) else None
+
+        position = self.decode_cursor(request)
+        if position is not None:
+            position = self.clean_position(position, queryset.model)
+            queryset = queryset.filter(self.build_seek_filter(position))
+        return queryset.order_by(*self.ordering)
+
+    def paginate_rows(self, rows, get_position):
+        """Takes one page from ordered rows, `get_position` returns a row's ordering values."""
+        page = list(rows[:self.page_size + 1])
+        self.has_next = len(page) > self.page_size
+        page = page[:self.page_size]
+        self.next_position = get_position(page[-1]) if self.has_next else None
+        return page
+
+    def get_position_fields(self):
+        return [name.lstrip('-') for name in self.ordering]
+
+    def clean_position(self, position, model):
+        """Converts the cursor values to the ordering fields' types, a tampered cursor is a 404."""
+        if len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        cleaned = []
+        for name, value in zip(self.get_position_fields(), position):
+            # JSON scalars only, and integers SQLite can bind
+            if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+                raise NotFound(self.invalid_cursor_message)
+            if isinstance(value, int) and not -2 ** 63 <= value < 2 ** 63:
+                raise NotFound(self.invalid_cursor_message)
+            if isinstance(value, float) and not math.isfinite(value):
+                raise NotFound(self.invalid_cursor_message)
+            try:
+                field = model._meta.get_field(name) if name != 'pk' else model._meta.pk
+            except FieldDoesNotExist:
+                # An annotation such as search_rank, which is always a number
+                if isinstance(value, str):
+                    raise NotFound(self.invalid_cursor_message)
+            else:
+                try:
+                    value = field.to_python(value)
+                except ValidationError:
+                    raise NotFound(self.invalid_cursor_message)
+            cleaned.append(value)
+        return cleaned
+
+    def build_seek_filter(self, position):
+        """
+        Builds the row-value comparison as ORs of ANDs, e.g. for ('-views', '-id'):
+        views < v OR (views = v AND id < i)
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            field = name.lstrip('-')
+            lookup = 'lt' if name.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{field}__{lookup}': value})
+            equal &= Q(**{field: value})
+        return condition
+
+    def get_page_size(self, request):
+        if self.page_size_query_param:
+            try:
+                return _positive_int(
+                    request.query_params[self.page_size_query_param],
+                    strict=True,
+                    cutoff=self.max_page_size
+                )
+            except (KeyError, ValueError):
+                pass
+        return self.page_size
+
+    def get_count(self, queryset):
+        """
+        Total of the filtered rows, cached per query and database.
+
+        The keyset queryset is counted without its ordering and annotations, so the
+        view's joins and GROUP BY are skipped. The cached total can lag behind by
+        `count_cache_timeout`, which is fine for "about N results".
+        """
+        queryset = queryset.order_by().values('pk')
+        sql, params = queryset.query.sql_with_params()
+        digest = hashlib.sha1(repr((sql, params)).encode('utf-8')).hexdigest()
+        key = f'keyset_count_{queryset.model._meta.label_lower}_{queryset.db}_{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, timeout=self.count_cache_timeout)
+        return count
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            position = json.loads(urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+        except (TypeError, ValueError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list):
+            raise NotFound(self.invalid_cursor_message)
+        return position
+
+    def encode_cursor(self, position):
+        data = json.dumps(position, separators=(',', ':'), default=str)
+        return urlsafe_b64encode(data.encode('utf-8')).decode('ascii')
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        payload = {'next': self.get_next_link()}
+        if self.count is not None:
+            payload['count'] = self.count
+        payload['results'] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
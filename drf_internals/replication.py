@@ -0,0 +1,51 @@
+# drf_internals/replication.py
+import os
+import threading
+import time
+from contextvars import ContextVar
+from django.conf import settings
+from django.db import connections
+
+# Set by ReplicaRoutingMiddleware for requests whose reads may be served by the replica
+replica_reads_allowed = ContextVar('replica_reads_allowed', default=False)
+# Set once the current request writes (or arrives with the pin cookie), reads stay on the primary
+primary_pinned = ContextVar('primary_pinned', default=False)
+
+_lock = threading.Lock()
+_lag_cache = {}  # alias -> (checked at, lag)
+
+def get_replica_alias():
+    """The replica alias, or None when this settings file doesn't define one."""
+    alias = getattr(settings, 'REPLICA_DATABASE', None)
+    return alias if alias in settings.DATABASES else None
+
+def get_replica_lag(alias, primary='default'):
+    """
+    How stale the replica is in seconds, re-checked at most once a second.
+
+    For the SQLite files: 0 while the primary hasn't changed since the last
+    sync_replica copy, otherwise the time since that copy (the oldest unseen write
+    is at most that old). A replica that was never synced is infinitely behind.
+    """
+    now = time.monotonic()
+    cached = _lag_cache.get(alias)
+    if cached is not None and now - cached[0] < 1.0:
+        return cached[1]
+
+    replica_path = connections.settings[alias]['NAME']
+    primary_path = connections.settings[primary]['NAME']
+    try:
+        replica_mtime = os.stat(replica_path).st_mtime
+        primary_mtime = os.stat(primary_path).st_mtime
+    except OSError:
+        lag = float('inf')
+    else:
+        try:
+            # In WAL mode recent writes only touch the -wal file until a checkpoint
+            primary_mtime = max(primary_mtime, os.stat(f'{primary_path}-wal').st_mtime)
+        except OSError:
+            pass
+        lag = max(0.0, time.time() - replica_mtime) if primary_mtime > replica_mtime else 0.0
+    with _lock:
+        _lag_cache[alias] = (now, lag)
+    return lag
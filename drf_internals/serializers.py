@@ -1,6 +1,44 @@
+from django.db.models import Count
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from .denylist import DenylistRefreshToken
 from orm_internals.models import Author, Article
 
+class SparseFieldsetsMixin:
+    """
+    Trims the serializer to ?fields=id,title or ?exclude=author.
+
+    Because QueryOptimizerMixin and ValuesListMixin build their queries from the
+    serializer's remaining fields, a narrow request also gets a narrower query:
+    no author JOIN without `author`, no tags GROUP BY without `tag_count`.
+    """
+    fields_query_param = 'fields'
+    exclude_query_param = 'exclude'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None:
+            return
+        params = getattr(request, 'query_params', request.GET)
+        requested = self.parse_field_list(params.get(self.fields_query_param))
+        excluded = self.parse_field_list(params.get(self.exclude_query_param))
+
+        unknown = (requested | excluded) - set(self.fields)
+        if unknown:
+            raise serializers.ValidationError(
+                {'fields': f"Unknown field(s): {', '.join(sorted(unknown))}"}
+            )
+        for name in list(self.fields):
+            if (requested and name not in requested) or name in excluded:
+                self.fields.pop(name)
+
+    def parse_field_list(self, value):
+        if not value:
+            return set()
+        return {name.strip() for name in value.split(',') if name.strip()}
+
+
 class AuthorSerializer(serializers.ModelSerializer):
     class Meta:
         model = Author
@@ -22,7 +60,7 @@ class BadArticleSerializer(serializers.ModelSerializer):
         """This method runs one query for every article"""
         return obj.tags.count()
     
-class GoodArticleSerializer(serializers.ModelSerializer):
+class GoodArticleSerializer(SparseFieldsetsMixin, serializers.ModelSerializer):
     """An efficient serializer."""
     author = AuthorSerializer()
 
@@ -31,4 +69,32 @@ class GoodArticleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Article
-        fields = ['id', 'title', 'author', 'tag_count']
\ No newline at end of file
+        fields = ['id', 'title', 'author', 'tag_count']
+        # Read by QueryOptimizerMixin, which annotates the queryset with these
+        annotations = {'tag_count': Count('tags')}
+
+
+class ArticleV2Serializer(GoodArticleSerializer):
+    """Version 2 adds views and updated_at; v1 clients don't select or serialize them."""
+
+    class Meta(GoodArticleSerializer.Meta):
+        fields = GoodArticleSerializer.Meta.fields + ['views', 'updated_at']
+
+
+class ArticleBulkItemSerializer(serializers.Serializer):
+    """
+    One item of a bulk upsert. Items with an `id` update that article, the rest are created.
+
+    `author` is a plain integer and `tags` a list of names, so validating thousands of
+    items runs no queries; existence checks are done once per batch by the service.
+    """
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=200)
+    views = serializers.IntegerField(required=False, min_value=0)
+    author = serializers.IntegerField(required=False, allow_null=True)
+    tags = serializers.ListField(child=serializers.CharField(max_length=50), required=False)
+
+
+class DenylistTokenRefreshSerializer(TokenRefreshSerializer):
+    """Refresh checks and rotation-blacklisting go through the in-memory denylist."""
+    token_class = DenylistRefreshToken
@@ -0,0 +1,125 @@
+# drf_internals/services.py
+from collections import Counter
+from django.db import router, transaction
+from django.utils import timezone
+from orm_internals.batching import batches, in_batches
+from orm_internals.models import Article, Author, Tag
+from orm_internals.stats import rebuild_author_stats
+from .cache import bump_article_generation
+from .serializers import ArticleBulkItemSerializer
+
+WRITE_BATCH_SIZE = 500
+
+def bulk_upsert_articles(items):
+    """
+    Creates/updates many articles with a fixed number of queries per batch.
+
+    Invalid items are reported by index and skipped, the valid ones are still
+    written (in a single transaction). Tags are given by name: existing ones are
+    looked up together, missing ones are created with one bulk_create, and the
+    article-tag rows are written with one more.
+    """
+    errors = []
+    valid = []
+    for index, item in enumerate(items):
+        serializer = ArticleBulkItemSerializer(data=item)
+        if serializer.is_valid():
+            valid.append((index, serializer.validated_data))
+        else:
+            errors.append({'index': index, 'errors': serializer.errors})
+
+    # Two items for one article can't both be applied, and picking one would be a guess
+    id_counts = Counter(data['id'] for _, data in valid if 'id' in data)
+    duplicates = {article_id for article_id, count in id_counts.items() if count > 1}
+    if duplicates:
+        for index, data in valid:
+            if data.get('id') in duplicates:
+                errors.append({'index': index, 'errors': {'id': [f"Article {data['id']} appears more than once."]}})
+        valid = [(index, data) for index, data in valid if data.get('id') not in duplicates]
+
+    # One query for all referenced authors and one for all articles to update
+    author_ids = {data['author'] for _, data in valid if data.get('author') is not None}
+    known_authors = set(in_batches(
+        lambda ids: Author.objects.filter(id__in=ids).values_list('id', flat=True), author_ids
+    ))
+    update_ids = {data['id'] for _, data in valid if 'id' in data}
+    existing = {}
+    for article in in_batches(lambda ids: Article.objects.filter(id__in=ids), update_ids):
+        existing[article.id] = article
+
+    to_create = []
+    to_update = {}
+    tagged = []  # (article, tag names)
+    now = timezone.now()
+    for index, data in valid:
+        if data.get('author') is not None and data['author'] not in known_authors:
+            errors.append({'index': index, 'errors': {'author': [f"Author {data['author']} does not exist."]}})
+            continue
+        if 'id' in data:
+            article = existing.get(data['id'])
+            if article is None:
+                errors.append({'index': index, 'errors': {'id': [f"Article {data['id']} does not exist."]}})
+                continue
+            article.title = data['title']
+            article.views = data.get('views', article.views)
+            if 'author' in data:
+                article.author_id = data['author']
+            # bulk_update() skips auto_now, so set it by hand
+            article.updated_at = now
+            to_update[article.id] = article
+        else:
+            article = Article(title=data['title'], views=data.get('views', 0), author_id=data.get('author'))
+            to_create.append(article)
+        if 'tags' in data:
+            tagged.append((article, data['tags']))
+
+    # The tenant router decides which database the whole batch goes to
+    using = router.db_for_write(Article)
+    with transaction.atomic(using=using):
+        # SQLite returns the new ids, so the tag rows below can reference them
+        Article.objects.bulk_create(to_create, batch_size=WRITE_BATCH_SIZE)
+        if to_update:
+            Article.objects.bulk_update(
+                list(to_update.values()), ['title', 'views', 'author', 'updated_at'], batch_size=WRITE_BATCH_SIZE
+            )
+        if tagged:
+            _set_tags(tagged)
+        # Bulk writes skip the signals that maintain AuthorStats, so recompute the
+        # authors involved, including the ones updated articles moved away from
+        touched = {article.author_id for article in to_create}
+        for article in to_update.values():
+            touched.update((article.author_id, article._loaded_stats.get('author_id')))
+        rebuild_author_stats(touched - {None}, using=using)
+        # Bulk writes don't send post_save / m2m_changed, so invalidate by hand
+        transaction.on_commit(bump_article_generation, using=using)
+
+    errors.sort(key=lambda error: error['index'])
+    return {
+        'created': [article.id for article in to_create],
+        'updated': list(to_update),
+        'errors': errors,
+    }
+
+def _set_tags(tagged):
+    """Replaces the tags of the given articles, creating missing tags by name."""
+    names = {name for _, tag_names in tagged for name in tag_names}
+    tag_ids = {}
+    for name, tag_id in in_batches(lambda batch: Tag.objects.filter(name__in=batch).values_list('name', 'id'), names):
+        tag_ids.setdefault(name, tag_id)
+    missing = [Tag(name=name) for name in names if name not in tag_ids]
+    Tag.objects.bulk_create(missing, batch_size=WRITE_BATCH_SIZE)
+    tag_ids.update((tag.name, tag.id) for tag in missing)
+
+    Through = Article.tags.through
+    article_ids = list({article.id for article, _ in tagged})
+    for batch in batches(article_ids):
+        Through.objects.filter(article_id__in=batch).delete()
+    Through.objects.bulk_create(
+        [
+            Through(article_id=article.id, tag_id=tag_id)
+            for article, tag_names in tagged
+            for tag_id in {tag_ids[name] for name in tag_names}
+        ],
+        batch_size=WRITE_BATCH_SIZE,
+        ignore_conflicts=True,
+    )
@@ -0,0 +1,28 @@
+# drf_internals/signals.py
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed
+from django.dispatch import receiver
+from orm_internals.models import Article, Author, Tag
+from .cache import bump_article_generation
+
+@receiver(post_save, sender=Article)
+@receiver(post_save, sender=Author)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Article)
+@receiver(post_delete, sender=Author)
+@receiver(post_delete, sender=Tag)
+def invalidate_article_cache(sender, using, **kwargs):
+    """Any write to the article data makes the cached article lists stale."""
+    bump_article_generation_on_commit(using)
+
+@receiver(m2m_changed, sender=Article.tags.through)
+def invalidate_article_cache_on_tags(sender, action, using, **kwargs):
+    # Only react once the through table has actually changed
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        bump_article_generation_on_commit(using)
+
+def bump_article_generation_on_commit(using):
+    bump_article_generation()
+    # A reader between the write and the commit can cache the old rows under the new
+    # generation, so bump again once they are visible (right away outside a transaction)
+    transaction.on_commit(bump_article_generation, using=using)
@@ -0,0 +1,96 @@
+# drf_internals/tenancy.py
+import copy
+import re
+import threading
+from collections import OrderedDict
+from contextvars import ContextVar
+from pathlib import Path
+from django.conf import settings
+from django.db import connections
+
+# Database alias of the tenant the current request belongs to, None outside tenant URLs
+current_tenant_db = ContextVar('current_tenant_db', default=None)
+
+TENANT_ALIAS_PREFIX = 'tenant_'
+# tenant_id ends up in a file name, so keep it to a safe alphabet
+TENANT_ID_RE = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+_lock = threading.Lock()
+# Recently used tenant aliases, oldest first
+_recent_aliases = OrderedDict()
+
+def is_tenant_alias(alias):
+    return alias.startswith(TENANT_ALIAS_PREFIX)
+
+def get_tenant_db_path(tenant_id):
+    return Path(settings.TENANT_DATABASE_DIR) / f'{tenant_id}.sqlite3'
+
+def get_tenant_ids():
+    """The registry of tenants: one SQLite file per tenant in TENANT_DATABASE_DIR."""
+    directory = Path(settings.TENANT_DATABASE_DIR)
+    if not directory.is_dir():
+        return []
+    return sorted(path.stem for path in directory.glob('*.sqlite3') if TENANT_ID_RE.match(path.stem))
+
+def register_tenant_database(tenant_id):
+    """
+    Adds the 'tenant_<id>' alias to the connection settings and returns it.
+
+    Nothing is opened, created or migrated here, provisioning is migrate_tenants' job.
+    """
+    if not TENANT_ID_RE.match(tenant_id):
+        raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+    alias = f'{TENANT_ALIAS_PREFIX}{tenant_id}'
+    if alias not in connections.settings:
+        # Same engine/options as default, just a different file
+        config = copy.deepcopy(connections.settings['default'])
+        config['NAME'] = str(get_tenant_db_path(tenant_id))
+        connections.settings[alias] = config
+    return alias
+
+def register_tenant_databases():
+    """Registers every existing tenant, so `--database tenant_<id>` works in any command."""
+    with _lock:
+        return [register_tenant_database(tenant_id) for tenant_id in get_tenant_ids()]
+
+def get_tenant_alias(tenant_id):
+    """
+    Returns the database alias of an existing tenant, LookupError if it has no database.
+
+    Each tenant has its own SQLite file, so a big tenant's writes never lock a small
+    tenant's tables. The files are created and migrated by `manage.py migrate_tenants`,
+    never during a request. Only the `TENANT_MAX_OPEN_DATABASES` most recently used
+    tenants are kept open, see close_evicted_connections().
+    """
+    if not TENANT_ID_RE.match(tenant_id):
+        raise ValueError(f"Invalid tenant id: {tenant_id!r}")
+    alias = f'{TENANT_ALIAS_PREFIX}{tenant_id}'
+
+    with _lock:
+        if alias in _recent_aliases:
+            _recent_aliases.move_to_end(alias)
+            return alias
+        if alias not in connections.settings:
+            # Provisioned after this process started
+            if not get_tenant_db_path(tenant_id).exists():
+                raise LookupError(f"Unknown tenant: {tenant_id!r}")
+            register_tenant_database(tenant_id)
+        _recent_aliases[alias] = None
+        while len(_recent_aliases) > settings.TENANT_MAX_OPEN_DATABASES:
+            # The alias stays registered, its connections are simply reopened when needed
+            _recent_aliases.popitem(last=False)
+    return alias
+
+def close_evicted_connections():
+    """
+    Closes the calling thread's connections to tenants that are no longer recently used.
+
+    Connections are per thread and can't be closed from another one, so every thread
+    calls this after each request. The open tenant databases then stay bounded by
+    TENANT_MAX_OPEN_DATABASES per thread, all of them among the recently used ones.
+    """
+    with _lock:
+        recent = set(_recent_aliases)
+    for connection in connections.all(initialized_only=True):
+        if is_tenant_alias(connection.alias) and connection.alias not in recent:
+            connection.close()
@@ -0,0 +1,124 @@
+# drf_internals/values.py
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+# Fields whose to_representation() is a no-op for the types the database hands back,
+# so the compiled row function can copy the column as is
+PASSTHROUGH_FIELDS = (
+    serializers.CharField,
+    serializers.IntegerField,
+    serializers.BooleanField,
+    serializers.FloatField,
+    serializers.ReadOnlyField,
+)
+
+class ValuesPlan:
+    """A flat values_list() projection plus a function that turns one row into the output dict."""
+
+    def __init__(self, columns, to_dict):
+        self.columns = columns
+        self.to_dict = to_dict
+
+
+# (serializer class, readable field names) -> ValuesPlan, or None when unsupported
+_plan_cache = {}
+
+def get_values_plan(serializer, model):
+    """
+    Compiles a read-only serializer into a ValuesPlan, once per field set.
+
+    Returns None if any field can't be expressed as plain columns (method fields,
+    many relations, properties...), the caller should use the regular serializer then.
+    """
+    key = (type(serializer), model, tuple(
+        name for name, field in serializer.fields.items() if not field.write_only
+    ))
+    if key not in _plan_cache:
+        _plan_cache[key] = compile_values_plan(serializer, model)
+    return _plan_cache[key]
+
+def compile_values_plan(serializer, model):
+    columns = []
+    converters = []
+    try:
+        expression = _compile(serializer, model, '', columns, converters)
+    except _Unsupported:
+        return None
+
+    # Generated once, so each row costs one dict literal and no per-field dispatch
+    source = f"def to_dict(row):\n    return {expression}\n"
+    namespace = {f'c{i}': converter for i, converter in enumerate(converters)}
+    exec(compile(source, f'<values plan for {type(serializer).__name__}>', 'exec'), namespace)
+    return ValuesPlan(columns, namespace['to_dict'])
+
+
+class _Unsupported(Exception):
+    pass
+
+def _column(path, columns):
+    if path not in columns:
+        columns.append(path)
+    return columns.index(path)
+
+def _compile(serializer, model, prefix, columns, converters):
+    """Returns the source of a dict literal reading from `row`, filling columns/converters."""
+    annotations = getattr(getattr(serializer, 'Meta', None), 'annotations', {})
+    items = []
+
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        name = field.field_name
+
+        if not prefix and name in annotations:
+            items.append(f'{name!r}: {_leaf(field, _column(name, columns), converters)}')
+            continue
+
+        if isinstance(field, (serializers.SerializerMethodField, serializers.ManyRelatedField,
+                              serializers.ListSerializer)) or field.source == '*':
+            raise _Unsupported(name)
+
+        model_field = _resolve(model, field.source_attrs)
+        path = prefix + '__'.join(field.source_attrs)
+
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise _Unsupported(name)
+            # The FK column itself tells us whether the nested object is null
+            marker = _column(path, columns)
+            nested = _compile(field, model_field.related_model, path + '__', columns, converters)
+            items.append(f'{name!r}: ({nested} if row[{marker}] is not None else None)')
+        elif model_field.is_relation:
+            if type(field) is not serializers.PrimaryKeyRelatedField or field.pk_field is not None:
+                raise _Unsupported(name)
+            if not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                raise _Unsupported(name)
+            # values_list('author') returns author_id, which is what the PK field outputs
+            items.append(f'{name!r}: row[{_column(path, columns)}]')
+        else:
+            items.append(f'{name!r}: {_leaf(field, _column(path, columns), converters)}')
+
+    return '{' + ', '.join(items) + '}'
+
+def _leaf(field, index, converters):
+    if type(field) in PASSTHROUGH_FIELDS:
+        return f'row[{index}]'
+    # Dates, decimals etc. still go through DRF's formatting, just without the dispatch
+    converters.append(field.to_representation)
+    converter = f'c{len(converters) - 1}'
+    return f'({converter}(row[{index}]) if row[{index}] is not None else None)'
+
+def _resolve(model, attrs):
+    """Follows a dotted source to a concrete model field, or gives up."""
+    model_field = None
+    for attr in attrs:
+        if model is None:
+            raise _Unsupported('.'.join(attrs))
+        try:
+            model_field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            raise _Unsupported('.'.join(attrs))
+        if model_field.many_to_many or model_field.one_to_many:
+            raise _Unsupported('.'.join(attrs))
+        model = model_field.related_model
+    return model_field
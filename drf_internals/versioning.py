@@ -0,0 +1,100 @@
+# drf_internals/versioning.py
+import re
+from rest_framework import exceptions
+from rest_framework.versioning import BaseVersioning
+
+class HeaderVersioning(BaseVersioning):
+    """Reads an integer API version from the X-Api-Version header, 1 when absent."""
+    version_header = 'X-Api-Version'
+    default_version = 1
+    invalid_version_message = 'Invalid version in "X-Api-Version" header.'
+
+    def determine_version(self, request, *args, **kwargs):
+        raw = request.headers.get(self.version_header)
+        if raw is None:
+            return self.default_version
+        try:
+            version = int(raw)
+        except ValueError:
+            raise exceptions.NotAcceptable(self.invalid_version_message)
+        if version < 1:
+            raise exceptions.NotAcceptable(self.invalid_version_message)
+        return version
+
+
+# list_v2, retrieve_v3...
+VERSIONED_HANDLER_RE = re.compile(r'^(?P<action>[a-z_][a-z0-9_]*?)_v(?P<version>[0-9]+)$')
+
+class VersionedViewSetMixin:
+    """
+    Per-version handlers, serializers and querysets, resolved through a table built at class creation.
+
+    - A method named `<action>_v<N>` handles `<action>` from version N on.
+    - `serializer_classes` / `querysets` map a version to what that version uses.
+
+    Anything a version doesn't declare falls back to the nearest lower version, and
+    requests for a version above the newest one get the newest. Each request then
+    costs one dict lookup, however many versions there are.
+    """
+    versioning_class = HeaderVersioning
+    serializer_classes = {}
+    querysets = {}
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls.build_version_table()
+
+    @classmethod
+    def build_version_table(cls):
+        handlers = {}  # action -> {version: method name}
+        for name in dir(cls):
+            match = VERSIONED_HANDLER_RE.match(name)
+            if match and callable(getattr(cls, name, None)):
+                handlers.setdefault(match['action'], {})[int(match['version'])] = name
+        for action, by_version in handlers.items():
+            # The plain method is version 1
+            if hasattr(cls, action):
+                by_version.setdefault(1, action)
+
+        versions = {1, *cls.serializer_classes, *cls.querysets}
+        for by_version in handlers.values():
+            versions.update(by_version)
+        cls.max_api_version = max(versions)
+
+        cls.version_handlers = {}
+        cls.version_serializers = {}
+        cls.version_querysets = {}
+        current = {}
+        serializer_class = queryset = None
+        for version in range(1, cls.max_api_version + 1):
+            for action, by_version in handlers.items():
+                current[action] = by_version.get(version, current.get(action))
+                if current[action] is not None:
+                    cls.version_handlers[(version, action)] = current[action]
+            serializer_class = cls.serializer_classes.get(version, serializer_class)
+            queryset = cls.querysets.get(version, queryset)
+            cls.version_serializers[version] = serializer_class
+            cls.version_querysets[version] = queryset
+
+    @property
+    def api_version(self):
+        version = getattr(getattr(self, 'request', None), 'version', None) or 1
+        return min(version, self.max_api_version)
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # dispatch() looks the handler up after initial(), so swapping it here is enough
+        handler_name = self.version_handlers.get((self.api_version, self.action))
+        if handler_name is not None and handler_name != self.action:
+            setattr(self, request.method.lower(), getattr(self, handler_name))
+
+    def get_serializer_class(self):
+        serializer_class = self.version_serializers.get(self.api_version)
+        return serializer_class or super().get_serializer_class()
+
+    def get_queryset(self):
+        queryset = self.version_querysets.get(self.api_version)
+        if queryset is None:
+            return super().get_queryset()
+        # .all() so results are never cached across requests
+        return queryset.all()
@@ -1,55 +1,83 @@
 # drf_internals/views.py
+import hashlib
 from django.core.cache import cache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from .renderers import CSVRenderer
+from django.http import StreamingHttpResponse
+from .cache import get_article_generation, get_cache_timeout
+from .renderers import StreamingCSVRenderer, fast_renderer_classes
 from orm_internals.models import Article
-from rest_framework.request import Request
-from rest_framework.renderers import JSONRenderer
+from rest_framework.renderers import BrowsableAPIRenderer, JSONRenderer
 from rest_framework import status
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
+from .denylist import DenylistRefreshToken
 
 class ArticleListView(APIView):
-    """A View that list articles and supports csv rendering."""
-    renderer_classes = [CSVRenderer] #Add our custom renderer
+    """A View that streams all articles as csv."""
+    renderer_classes = [StreamingCSVRenderer] #Add our custom renderer
+    csv_fields = ('id', 'title', 'views')
+    # Full-table exports read from the replica (see ReplicaRoutingMiddleware)
+    use_replica = True
+    # Rows fetched from the database per round trip
+    iterator_chunk_size = 2000
 
     def get(self, request, format=None):
         """
-        Returns a list of all articles.
+        Streams a list of all articles.
         """
 
-        # For simplicity, we'are not using serializers yet
-        articles_data = list(Article.objects.values('id', 'title','views'))
-        return Response(articles_data)
+        # values_list() + iterator() keeps only one chunk of plain tuples in memory,
+        # instead of list()-ing the whole table up front
+        queryset = Article.objects.order_by('id')
+        # The rows are read while the response streams, after the middleware has
+        # reset the routing state, so pick the database now
+        queryset = queryset.using(queryset.db)
+        rows = queryset.values_list(*self.csv_fields).iterator(chunk_size=self.iterator_chunk_size)
+        renderer = self.renderer_classes[0]()
+        response = StreamingHttpResponse(
+            renderer.render(rows, renderer_context={'header': self.csv_fields}),
+            content_type=renderer.media_type,
+        )
+        response['Content-Disposition'] = 'attachment; filename="articles.csv"'
+        return response
 
 class CachedArticleView(APIView):
     """
         A custom APIView that short-circuits the request if a cached response exits.
+
+        The cache holds the rendered bytes together with a strong ETag, so a hit never
+        re-renders and a conditional request (If-None-Match) gets a 304 without touching
+        the database. There is no Last-Modified: max(updated_at) doesn't move when a row
+        is deleted, and its 1 second resolution misses writes within the same second.
     """
+    # Cached bytes are served to every client, so pin the representation to JSON
+    renderer_classes = [JSONRenderer]
+    # Freshness comes from the generation in the key, the timeout only bounds memory.
+    # That needs a shared cache: on LocMemCache it is capped, see get_cache_timeout()
+    cache_timeout = 60 * 60 * 6
 
     def dispatch(self, request, *args, **kwargs):
         "Define a unique cache key for this request"
         params = getattr(request, "query_params", None)
         qs = params.urlencode() if params is not None else request.GET.urlencode()
-        cache_key = f"article_view_{request.path}_{qs}"
+        # The generation changes on every article/author/tag write (see signals.py),
+        # so on a shared cache entries can live for hours and still never be served stale
+        cache_key = f"article_view_{get_article_generation()}_{request.path}_{qs}"
 
         # Try to get the response from the cache
-        cached_response_data = cache.get(cache_key)
-        
-        if cached_response_data:
+        cached = cache.get(cache_key)
+
+        if cached:
             print('Cache HIT! Short-circuiting with a cached response')
-            drf_request = Request(request)
-            renderer = JSONRenderer()
-            response = Response(cached_response_data)
-            response.accepted_renderer = renderer
-            response.accepted_media_type = renderer.media_type
-            response.renderer_context = {
-                'request': drf_request,
-                'response': response,
-            }
-            return response
-        
+            response = self.build_cached_response(cached)
+            # Returns a 304 if the client already has this version
+            return get_conditional_response(
+                request, etag=cached['etag'], response=response
+            )
+
         print("Cache MISS! Proceeding with the normal dispatch.")
         # If not in cache, proceed with the normal DRF dispatch
         response = super().dispatch(request, *args, **kwargs)
@@ -57,17 +85,37 @@ class CachedArticleView(APIView):
         # After the response is generated, cache it for future requests
         if response.status_code == 200:
             print('Caching the new response.')
-            cache.set(cache_key, response.data, timeout=60)
-        
+            # Render once here; every hit after this reuses the bytes
+            response.render()
+            cached = {
+                'content': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(response.content, usedforsecurity=False).hexdigest()),
+            }
+            cache.set(cache_key, cached, timeout=get_cache_timeout(self.cache_timeout))
+            self.set_validators(response, cached)
+            return get_conditional_response(
+                request, etag=cached['etag'], response=response
+            )
+
         return response
-    
+
+    def build_cached_response(self, cached):
+        """Builds a plain HttpResponse from the cached bytes, no rendering involved."""
+        response = HttpResponse(cached['content'], content_type=cached['content_type'])
+        self.set_validators(response, cached)
+        return response
+
+    def set_validators(self, response, cached):
+        response['ETag'] = cached['etag']
+
     # Fetch the details only if it is not in the cache or if the cache has the timeout
     def get(self, request, format=None):
         article_data = list(Article.objects.values('id', 'title', 'views'))
         return Response(article_data)
     
 # Day 19
-from .serializers import BadArticleSerializer, GoodArticleSerializer
+from .serializers import ArticleV2Serializer, BadArticleSerializer, GoodArticleSerializer
 from rest_framework.generics import ListAPIView
 from django.db.models import Count
 
@@ -89,35 +137,64 @@ class GoodArticleListView(ListAPIView):
 
 # Day 20
 from rest_framework import viewsets
-
-class ArticleViewSet(viewsets.ReadOnlyModelViewSet):
+from rest_framework.decorators import action
+from .services import bulk_upsert_articles
+from .filters import ArticleSearchFilter
+from .mixins import CountViewsMixin, QueryOptimizerMixin, ValuesListMixin
+from .pagination import KeysetPagination
+from .versioning import VersionedViewSetMixin
+
+class ArticleViewSet(CountViewsMixin, QueryOptimizerMixin, viewsets.ReadOnlyModelViewSet):
     """A simple viewset for viewing articles."""
     serializer_class = GoodArticleSerializer
-    queryset = Article.objects.all() # We will overide this later
+    # The mixin adds the JOIN on author and the tag_count annotation from the serializer.
+    # Results are cached until an article, author or tag row is written
+    queryset = Article.objects.cached(timeout=60)
+    filter_backends = [ArticleSearchFilter]
 
 
-from .routers import versioned_dispatch
-class VersionedArticleViewSet(viewsets.ReadOnlyModelViewSet):
+class VersionedArticleViewSet(CountViewsMixin, ValuesListMixin, QueryOptimizerMixin,
+                              VersionedViewSetMixin, viewsets.ReadOnlyModelViewSet):
     serializer_class = GoodArticleSerializer
-    
-    def get_queryset(self):
-        tenant_id = self.kwargs['tenant_id']
-        print(f"Filtering for tenant: {tenant_id}")
-        return Article.objects.select_related('author').annotate(
-        tag_count = Count('tags')
-    )
-
-    @versioned_dispatch
-    def versioned_list(self, request, *args, **kwargs):
-        """V1 list method."""
-        print("Running V1 of the list method.")
-        return self.list(request, *args, **kwargs)
+    queryset = Article.objects.all()
+    # Picked per request from the X-Api-Version header, versions above 2 get v2
+    serializer_classes = {
+        1: GoodArticleSerializer,
+        2: ArticleV2Serializer,
+    }
+    # Seeks on (views, id) using article_views_id_idx, no COUNT(*) or OFFSET.
+    # The seek runs on get_keyset_queryset(), only the page gets tag_count
+    pagination_class = KeysetPagination
+    filter_backends = [ArticleSearchFilter]
+    # orjson / msgpack when installed, picked by the Accept header
+    renderer_classes = fast_renderer_classes(JSONRenderer, BrowsableAPIRenderer)
+    bulk_max_items = 5000
+
+    @property
+    def keyset_ordering(self):
+        # Search results are paged in rank order, everything else by views
+        if ArticleSearchFilter().get_search_text(self.request):
+            return ('search_rank', 'id')
+        return KeysetPagination.ordering
+
+    @action(detail=False, methods=['post'], url_path='bulk', permission_classes=[IsAuthenticated])
+    def bulk(self, request, *args, **kwargs):
+        """
+        Creates/updates up to `bulk_max_items` articles in one request.
 
-    def versioned_list_v2(self, request, *args, **kwargs):
-        """V2 list method."""
-        print("Running V2 of the list method.")
-        return self.list(request, *args, **kwargs)
-    
+        Invalid items are reported per index in `errors` and don't stop the rest.
+        """
+        if not isinstance(request.data, list):
+            return Response({'detail': 'Expected a list of articles.'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(request.data) > self.bulk_max_items:
+            return Response(
+                {'detail': f'At most {self.bulk_max_items} articles per request.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        result = bulk_upsert_articles(request.data)
+        if request.data and not (result['created'] or result['updated']):
+            return Response(result, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result)
 
 
 # Day 21:
@@ -127,8 +204,8 @@ class LogoutView(APIView):
     def post(self, request):
         try:
             refresh_token = request.data['refresh']
-            token = RefreshToken(refresh_token)
-            token.blacklist() # Add the token to the denylist
+            token = DenylistRefreshToken(refresh_token)
+            token.blacklist() # Add the token to the denylist (db + this process's bloom filter)
             return Response(status=status.HTTP_205_RESET_CONTENT)
         except Exception as e:
             return Response(status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
@@ -50,6 +50,7 @@ MIDDLEWARE = [
     # 'middleware_internals.middleware.RequestTimingMiddleware',
     # 'middleware_internals.middleware.SimpleAuthMiddleware',
     # 'middleware_internals.middleware.RateLimitHeaderMiddleware',
+    # 'middleware_internals.middleware.NPlusOneMiddleware',
     "lifecycle_demo.middleware.LifecycleLoggerMiddleware",
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -58,8 +59,15 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'drf_internals.middleware.TenantDatabaseMiddleware',
+    'drf_internals.middleware.ReplicaRoutingMiddleware',
 ]
 
+# Used by NPlusOneMiddleware and NPlusOneDetector: repetitions of one query that count as
+# an N+1, and what the middleware does about it ('log', 'header' or 'raise')
+NPLUSONE_THRESHOLD = 5
+NPLUSONE_ACTION = 'log'
+
 ROOT_URLCONF = 'lifecycle_project.urls'
 
 TEMPLATES = [
@@ -88,9 +96,30 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
-    }
+    },
+    # Read replica: locally a copy of db.sqlite3 refreshed by `manage.py sync_replica`
+    'replica': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': BASE_DIR / 'db.replica.sqlite3',
+        'TEST': {'MIRROR': 'default'},
+    },
 }
 
+# See drf_internals.db_routers.ReplicaRouter / middleware.ReplicaRoutingMiddleware
+REPLICA_DATABASE = 'replica'
+# Reads fall back to the primary when the replica is further behind than this (seconds)
+REPLICA_MAX_LAG = 30
+# How long a client that wrote something keeps reading from the primary
+REPLICA_STICKY_SECONDS = 10
+
+# Every <tenant_id> from the TenantVersionRouter URLs has its own SQLite file here,
+# created by `manage.py migrate_tenants <id>` and registered at startup as the
+# 'tenant_<id>' alias (see drf_internals/tenancy.py).
+# Outside tenant URLs ReplicaRouter may send reads to the replica
+DATABASE_ROUTERS = ['drf_internals.db_routers.TenantRouter', 'drf_internals.db_routers.ReplicaRouter']
+TENANT_DATABASE_DIR = BASE_DIR / 'tenant_dbs'
+TENANT_MAX_OPEN_DATABASES = 32
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -132,8 +161,20 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
-FERNET_KEY=b'FbEVrbU3nVDuKgbzVBld1wke89cl-44vqQdywhvIDPM='
-
+# EncryptedTextField keys: the first one encrypts, all of them decrypt. To rotate, put a
+# new key first, run `manage.py rotate_encryption_keys`, then remove the old key
+FERNET_KEYS = [
+    b'FbEVrbU3nVDuKgbzVBld1wke89cl-44vqQdywhvIDPM=',
+]
+# HMAC key of BlindIndexField (equality lookups on encrypted fields). Keep it apart from
+# FERNET_KEYS; changing it means recomputing every blind index
+BLIND_INDEX_KEY = b'2f0bQk9mX4ZxR7pL1sVd8nHc3uYw6eTa'
+# Decrypted EncryptedTextField values kept in memory per process (0 disables the cache)
+ENCRYPTED_FIELD_CACHE_SIZE = 1024
+
+# Cache invalidation (article generations, .cached() table versions) is shared through
+# this cache, so production needs a shared backend (Redis, Memcached). On LocMemCache
+# each worker only sees its own writes and entries are capped at 60 seconds.
 CACHES = {
     'default': {
         'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
@@ -143,7 +184,8 @@ CACHES = {
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES':(
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # JWTAuthentication plus a cache of already verified tokens
+        'drf_internals.authentication.CachedJWTAuthentication',
     )
 }
 
@@ -154,4 +196,6 @@ SIMPLE_JWT ={
     'REFRESH_TOKEN_LIFETIME': timedelta(days=1),
     'ROTATE_REFRESH_TOKENS': True,
     'BLACKLIST_AFTER_ROTATION':True,
+    # Checks refresh tokens against the in-memory JTI denylist (drf_internals/denylist.py)
+    'TOKEN_REFRESH_SERIALIZER': 'drf_internals.serializers.DenylistTokenRefreshSerializer',
 }
\ No newline at end of file
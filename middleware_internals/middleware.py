@@ -1,5 +1,7 @@
 import time
+from django.conf import settings
 from django.http import HttpResponseForbidden, HttpResponse
+from orm_internals.query_detector import NPlusOneDetector
 
 # Middleware 1: Request Timing
 class RequestTimingMiddleware:
@@ -46,3 +48,35 @@ class RateLimitHeaderMiddleware:
         print("Added rate limit header.")
         return response
 
+
+# Middleware 4: N+1 detector (dev servers only, it slows every query down)
+class NPlusOneMiddleware:
+    """
+    Reports queries repeated NPLUSONE_THRESHOLD times or more within one request.
+
+    NPLUSONE_ACTION is 'log' (print the report), 'header' (X-NPlusOne lists the
+    offending call sites) or 'raise' (NPlusOneError, the debug page shows the report).
+    Queries run while a StreamingHttpResponse is consumed happen after this returns,
+    so they aren't seen.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.action = getattr(settings, 'NPLUSONE_ACTION', 'log')
+
+    def __call__(self, request):
+        with NPlusOneDetector(self.threshold, raise_on_exit=self.action == 'raise') as detector:
+            # DRF responses are rendered inside get_response, so serializer queries are counted
+            response = self.get_response(request)
+
+        problems = detector.problems
+        if problems and self.action == 'header':
+            summary = []
+            for key, count, call_sites in problems:
+                # Innermost frame of the most frequent call site
+                frames = call_sites[0][0]
+                summary.append(f"{count}x {frames[0] if frames else 'unknown'}")
+            response['X-NPlusOne'] = ', '.join(summary)
+        elif problems:
+            print(f"{request.method} {request.path}: {detector.report()}")
+        return response
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class OrmInternalsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'orm_internals'
+
+    def ready(self):
+        from . import signals
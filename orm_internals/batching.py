@@ -0,0 +1,17 @@
+# orm_internals/batching.py
+
+# Stay under SQLite's limit on bound parameters per statement (999 before 3.32)
+IN_BATCH_SIZE = 900
+
+def batches(values, batch_size=IN_BATCH_SIZE):
+    """Yields consecutive slices of `values` with at most `batch_size` items."""
+    values = list(values)
+    for start in range(0, len(values), batch_size):
+        yield values[start:start + batch_size]
+
+def in_batches(query, values, batch_size=IN_BATCH_SIZE):
+    """Runs `query(batch)` for each slice of `values` and chains the results."""
+    results = []
+    for batch in batches(values, batch_size):
+        results.extend(query(batch))
+    return results
@@ -0,0 +1,128 @@
+# orm_internals/benchmarks.py
+import gc
+import math
+import time
+from django.db import connection
+from django.db.models import Count, OuterRef, Subquery
+from django.test.utils import CaptureQueriesContext
+from orm_internals.models import Article, Author
+
+# name -> (function(limit) returning the number of rows it produced, description)
+BENCHMARKS = {}
+
+def benchmark(name, description):
+    """Registers a scenario. Scenarios must be read-only so they can be repeated."""
+    def decorator(func):
+        BENCHMARKS[name] = (func, description)
+        return func
+    return decorator
+
+
+@benchmark('n1_bad', 'Articles with author and tags, lazy loaded (N+1)')
+def n1_bad(limit):
+    rows = 0
+    for article in Article.objects.order_by('id')[:limit]:
+        author_name = article.author.name if article.author_id else None
+        tag_names = ", ".join(tag.name for tag in article.tags.all())
+        rows += 1
+    return rows
+
+@benchmark('n1_good', 'Articles with author and tags, select_related + prefetch_related')
+def n1_good(limit):
+    rows = 0
+    for article in Article.objects.select_related('author').prefetch_related('tags').order_by('id')[:limit]:
+        author_name = article.author.name if article.author_id else None
+        tag_names = ", ".join(tag.name for tag in article.tags.all())
+        rows += 1
+    return rows
+
+@benchmark('author_subquery', 'Authors with article count and top article title (run_sql_compiler)')
+def author_subquery(limit):
+    most_viewed_subquery = Subquery(
+        Article.objects.filter(author=OuterRef('pk')).order_by('-views').values('title')[:1]
+    )
+    authors = Author.objects.annotate(
+        article_count=Count('article'),
+        most_viwed_article_title=most_viewed_subquery,
+    ).order_by('id')[:limit]
+    return len(list(authors))
+
+def _list_view(view_class, limit):
+    from rest_framework.test import APIRequestFactory
+    # Same view, but sliced, so the unpaginated list stays comparable across dataset sizes
+    view = view_class.as_view(queryset=view_class.queryset.order_by('id')[:limit])
+    response = view(APIRequestFactory().get('/articles/'))
+    response.render()
+    return len(response.data)
+
+@benchmark('drf_bad_list', 'BadArticleListView: nested author + SerializerMethodField')
+def drf_bad_list(limit):
+    from drf_internals.views import BadArticleListView
+    return _list_view(BadArticleListView, limit)
+
+@benchmark('drf_good_list', 'GoodArticleListView: select_related + tag_count annotation')
+def drf_good_list(limit):
+    from drf_internals.views import GoodArticleListView
+    return _list_view(GoodArticleListView, limit)
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(percent / 100 * len(samples)))
+    return samples[rank - 1]
+
+def run_benchmark(name, limit, warmup=2, repeat=20):
+    """
+    Runs one scenario and returns its timings (ms), query count and row count.
+
+    Timed runs don't record queries, that would add the debug cursor's overhead
+    to every sample. The query count comes from one extra, untimed run instead.
+    """
+    func, description = BENCHMARKS[name]
+    for _ in range(warmup):
+        func(limit)
+
+    samples = []
+    gc.collect()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(limit)
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+
+    with CaptureQueriesContext(connection) as captured:
+        rows = func(limit)
+
+    return {
+        'description': description,
+        'runs': repeat,
+        'min': samples[0],
+        'mean': sum(samples) / len(samples),
+        'p50': percentile(samples, 50),
+        'p95': percentile(samples, 95),
+        'p99': percentile(samples, 99),
+        'max': samples[-1],
+        'queries': len(captured),
+        'rows': rows,
+    }
+
+def compare_results(results, baseline, threshold):
+    """
+    Returns a list of regressions against a baseline.
+
+    A benchmark regresses when its p95 is more than `threshold` (a fraction) above
+    the baseline p95, or when it runs more queries than it used to.
+    """
+    regressions = []
+    for name, result in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if result['p95'] > previous['p95'] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 {result['p95']:.2f}ms vs {previous['p95']:.2f}ms "
+                f"(+{(result['p95'] / previous['p95'] - 1) * 100:.0f}%)"
+            )
+        if result['queries'] > previous['queries']:
+            regressions.append(f"{name}: {result['queries']} queries vs {previous['queries']}")
+    return regressions
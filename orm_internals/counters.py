@@ -0,0 +1,129 @@
+# orm_internals/counters.py
+import atexit
+import os
+import threading
+from collections import defaultdict
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F
+from drf_internals.cache import bump_article_generation
+from orm_internals.batching import batches
+from orm_internals.models import Article
+from orm_internals.stats import articles_gained_views
+
+
+class ViewCounter:
+    """
+    Write-behind counter for Article.views.
+
+    incr() only adds to an in-memory delta per (database, article), so a hot article
+    costs one dict update per hit instead of one UPDATE and a write lock. The deltas
+    are flushed as `views = views + n` UPDATEs, one per distinct n per batch of ids:
+    every `flush_interval` seconds from a daemon thread, as soon as `flush_threshold`
+    articles are pending, and at interpreter exit.
+
+    The buffer is per process. A crash (not a normal exit) loses at most one
+    interval's worth of counts, and pending counts are only visible to other
+    processes after the flush.
+    """
+
+    def __init__(self, flush_interval=5.0, flush_threshold=1000):
+        self.flush_interval = flush_interval
+        self.flush_threshold = flush_threshold
+        self.lock = threading.Lock()
+        self.pending = defaultdict(lambda: defaultdict(int))  # alias -> article id -> delta
+        self.pending_count = 0
+        self.pid = None
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def incr(self, article_id, amount=1, using=DEFAULT_DB_ALIAS):
+        with self.lock:
+            self._ensure_started()
+            deltas = self.pending[using]
+            if article_id not in deltas:
+                self.pending_count += 1
+            deltas[article_id] += amount
+            full = self.pending_count >= self.flush_threshold
+        if full:
+            self.flush()
+
+    def get_pending(self, article_id, using=DEFAULT_DB_ALIAS):
+        """Views counted here but not written yet, to add to what the database says."""
+        with self.lock:
+            return self.pending.get(using, {}).get(article_id, 0)
+
+    def flush(self):
+        """Writes all pending deltas. Returns the number of articles updated."""
+        with self.lock:
+            pending, self.pending = self.pending, defaultdict(lambda: defaultdict(int))
+            self.pending_count = 0
+
+        flushed = 0
+        error = None
+        for using, deltas in pending.items():
+            try:
+                self._write(using, deltas)
+            except Exception as exc:
+                # Put the counts back so they go out with the next flush, and still
+                # write the other databases before reporting it
+                with self.lock:
+                    for article_id, amount in deltas.items():
+                        if article_id not in self.pending[using]:
+                            self.pending_count += 1
+                        self.pending[using][article_id] += amount
+                error = error or exc
+                continue
+            flushed += len(deltas)
+        if error is not None:
+            raise error
+        return flushed
+
+    def _write(self, using, deltas):
+        # Articles with the same delta share one UPDATE ... WHERE id IN (...)
+        by_amount = defaultdict(list)
+        for article_id, amount in deltas.items():
+            by_amount[amount].append(article_id)
+
+        with transaction.atomic(using=using):
+            for amount, article_ids in by_amount.items():
+                for batch in batches(article_ids):
+                    Article.objects.using(using).filter(id__in=batch).update(
+                        views=F('views') + amount
+                    )
+            # update() sends no signals, so move the AuthorStats tops and invalidate
+            # the cached article lists (they include views) here
+            articles_gained_views(list(deltas), using=using)
+            transaction.on_commit(bump_article_generation, using=using)
+
+    def _ensure_started(self):
+        """Starts the flush thread in this process (again after a fork). Called with the lock held."""
+        if self.pid == os.getpid():
+            return
+        if self.pid is not None:
+            # Forked child: the parent's deltas are the parent's to write
+            self.pending = defaultdict(lambda: defaultdict(int))
+            self.pending_count = 0
+        else:
+            atexit.register(self.stop)
+        self.pid = os.getpid()
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='view-counter-flush', daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as exc:
+                print(f"View counter flush failed, will retry: {exc}")
+            finally:
+                # This thread's connections would otherwise stay open forever
+                connections.close_all()
+
+    def stop(self):
+        """Stops the flush thread and writes what's left."""
+        self.stopped.set()
+        self.flush()
+
+
+view_counter = ViewCounter()
@@ -0,0 +1,23 @@
+# orm_internals/management/commands/rebuild_author_stats.py
+import time
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from orm_internals.batching import IN_BATCH_SIZE
+from orm_internals.stats import rebuild_author_stats
+
+class Command(BaseCommand):
+    help = 'Recomputes AuthorStats from the article table (all authors, or the given ids).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('author_ids', nargs='*', type=int)
+        parser.add_argument('--batch-size', type=int, default=IN_BATCH_SIZE)
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        start = time.time()
+        with transaction.atomic(using=using):
+            written = rebuild_author_stats(
+                options['author_ids'] or None, using=using, batch_size=options['batch_size']
+            )
+        print(f"Rebuilt stats for {written} authors in {time.time() - start:.2f}s.")
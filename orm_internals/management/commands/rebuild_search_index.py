@@ -0,0 +1,19 @@
+# orm_internals/management/commands/rebuild_search_index.py
+import time
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from orm_internals.search import rebuild_search_index
+
+class Command(BaseCommand):
+    help = 'Rebuilds the FTS5 article search index from the article and author tables.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if connections[using].vendor != 'sqlite':
+            raise CommandError("The search index is SQLite FTS5 only.")
+        start = time.time()
+        indexed = rebuild_search_index(using)
+        print(f"Indexed {indexed} articles in {time.time() - start:.2f}s.")
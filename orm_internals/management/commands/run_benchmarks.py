@@ -0,0 +1,84 @@
+# orm_internals/management/commands/run_benchmarks.py
+import json
+from pathlib import Path
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+from orm_internals.benchmarks import BENCHMARKS, compare_results, run_benchmark
+from orm_internals.models import Article
+
+class Command(BaseCommand):
+    help = 'Runs the ORM benchmark scenarios and compares them against a saved baseline.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Scenarios to run (default: all)')
+        parser.add_argument('--list', action='store_true', help='List the scenarios and exit')
+        parser.add_argument('--limit', type=int, default=500, help='Rows each scenario reads')
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+        parser.add_argument('--baseline', help='Baseline JSON file to compare against')
+        parser.add_argument('--save-baseline', action='store_true', help='Write the results to --baseline instead of comparing')
+        parser.add_argument('--threshold', type=float, default=0.2, help='Allowed p95 slowdown, as a fraction (0.2 = 20%%)')
+
+    def handle(self, *args, **options):
+        if options['list']:
+            for name, (func, description) in BENCHMARKS.items():
+                print(f"{name:<18} {description}")
+            return
+
+        names = options['names'] or list(BENCHMARKS)
+        unknown = [name for name in names if name not in BENCHMARKS]
+        if unknown:
+            raise CommandError(f"Unknown benchmark(s): {', '.join(unknown)}. Use --list to see them.")
+        if options['repeat'] < 1:
+            raise CommandError("--repeat must be at least 1.")
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError("--save-baseline needs --baseline <file>.")
+        if not Article.objects.exists():
+            raise CommandError("No articles to benchmark, run seed_articles first.")
+
+        results = {}
+        print(f"{'benchmark':<18} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'rows':>7}")
+        for name in names:
+            result = run_benchmark(name, options['limit'], options['warmup'], options['repeat'])
+            results[name] = result
+            print(
+                f"{name:<18} {result['p50']:>7.2f}ms {result['p95']:>7.2f}ms {result['p99']:>7.2f}ms "
+                f"{result['queries']:>8} {result['rows']:>7}"
+            )
+
+        report = {
+            'meta': {
+                'created': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'articles': Article.objects.count(),
+                'limit': options['limit'],
+                'warmup': options['warmup'],
+                'repeat': options['repeat'],
+            },
+            'results': results,
+        }
+        if options['output']:
+            Path(options['output']).write_text(json.dumps(report, indent=2))
+            print(f"Results written to {options['output']}")
+
+        if not options['baseline']:
+            return
+        baseline_path = Path(options['baseline'])
+        if options['save_baseline']:
+            baseline_path.write_text(json.dumps(report, indent=2))
+            print(f"Baseline saved to {baseline_path}")
+            return
+
+        try:
+            baseline = json.loads(baseline_path.read_text())
+        except (OSError, ValueError) as exc:
+            raise CommandError(f"Can't read baseline {baseline_path}: {exc}")
+        if baseline['meta'].get('limit') != options['limit']:
+            print(f"Warning: baseline was recorded with --limit {baseline['meta'].get('limit')}.")
+
+        regressions = compare_results(results, baseline['results'], options['threshold'])
+        if regressions:
+            raise CommandError("Performance regressions:\n  " + "\n  ".join(regressions))
+        print(f"No regressions against {baseline_path} (threshold {options['threshold']:.0%}).")
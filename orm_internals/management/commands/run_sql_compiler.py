@@ -1,6 +1,6 @@
 from django.core.management.base import BaseCommand
 from django.db.models import Count, Avg, Subquery, OuterRef
-from orm_internals.models import Article, Author
+from orm_internals.models import Article, Author, AuthorStats
 
 def setup_data():
     """Create some sample data."""
@@ -52,6 +52,14 @@ def run_complex_query():
     for author in author_qs:
         print(f"{author.name} (Articles: {author.article_count}) - Top Article: {author.most_viwed_article_title}")
 
+    # 5. The same numbers from the denormalized AuthorStats table: one indexed read
+    # with a join, no GROUP BY and no subquery per author
+    print("\n--- From AuthorStats ---")
+    stats_qs = AuthorStats.objects.select_related('author', 'top_article').order_by('-top_views')
+    for stats in stats_qs:
+        top_title = stats.top_article.title if stats.top_article else None
+        print(f"{stats.author.name} (Articles: {stats.article_count}) - Top Article: {top_title}")
+
 class Command(BaseCommand):
     help = 'Demonstrates the SQL Compiler'
 
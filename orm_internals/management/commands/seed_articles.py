@@ -0,0 +1,116 @@
+# orm_internals/management/commands/seed_articles.py
+import time
+from multiprocessing import Pool
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+from django.db.models import Max
+from django.utils import timezone
+from drf_internals.cache import bump_article_generation
+from orm_internals import seeding
+from orm_internals.models import Author, AuthorStats, Article, Tag
+from orm_internals.stats import rebuild_author_stats
+
+class Command(BaseCommand):
+    help = 'Bulk-seeds authors, power-law tagged articles and article-tag rows at production scale.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--articles', type=int, default=1_000_000)
+        parser.add_argument('--authors', type=int, default=2_000)
+        parser.add_argument('--tags', type=int, default=5_000)
+        parser.add_argument('--max-tags', type=int, default=5, help='Max tags per article')
+        parser.add_argument('--tag-alpha', type=float, default=1.1, help='Zipf exponent of tag popularity')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=5_000, help='Articles per chunk/transaction')
+        parser.add_argument('--workers', type=int, default=1, help='Processes generating rows (writes stay in this one)')
+        parser.add_argument('--database', default='default')
+        parser.add_argument('--clear', action='store_true', help='Delete existing articles, authors and tags first')
+
+    def handle(self, *args, **options):
+        using = options['database']
+        if options['clear']:
+            self.clear(using)
+
+        start = time.time()
+        first_author_id = self.next_id(Author, using)
+        first_tag_id = self.next_id(Tag, using)
+        first_article_id = self.next_id(Article, using)
+
+        # Explicit ids, so tag rows can reference articles without reading ids back
+        with transaction.atomic(using=using):
+            Author.objects.using(using).bulk_create(
+                [Author(id=first_author_id + i, name=f"Author {first_author_id + i}") for i in range(options['authors'])],
+                batch_size=options['batch_size'],
+            )
+            Tag.objects.using(using).bulk_create(
+                [Tag(id=first_tag_id + i, name=f"tag-{first_tag_id + i}") for i in range(options['tags'])],
+                batch_size=options['batch_size'],
+            )
+        print(f"Created {options['authors']} authors and {options['tags']} tags.")
+
+        config = {
+            'seed': options['seed'],
+            'authors': options['authors'],
+            'first_author_id': first_author_id,
+            'tags': options['tags'],
+            'first_tag_id': first_tag_id,
+            'max_tags': options['max_tags'],
+            'cum_weights': seeding.power_law_cum_weights(options['tags'], options['tag_alpha']),
+        }
+        batch_size = options['batch_size']
+        chunks = [
+            (index, first_article_id + offset, min(batch_size, options['articles'] - offset))
+            for index, offset in enumerate(range(0, options['articles'], batch_size))
+        ]
+
+        article_count = tag_row_count = 0
+        if options['workers'] > 1:
+            with Pool(options['workers'], initializer=seeding.init_worker, initargs=(config,)) as pool:
+                for articles, article_tags in pool.imap(seeding.generate_chunk, chunks):
+                    self.write_chunk(articles, article_tags, using)
+                    article_count += len(articles)
+                    tag_row_count += len(article_tags)
+                    self.report(article_count, tag_row_count, start)
+        else:
+            seeding.init_worker(config)
+            for chunk in chunks:
+                articles, article_tags = seeding.generate_chunk(chunk)
+                self.write_chunk(articles, article_tags, using)
+                article_count += len(articles)
+                tag_row_count += len(article_tags)
+                self.report(article_count, tag_row_count, start)
+
+        # bulk_create sends no signals, so fill AuthorStats and drop the cached article lists by hand
+        rebuild_author_stats(range(first_author_id, first_author_id + options['authors']), using=using)
+        bump_article_generation()
+        duration = time.time() - start
+        total = options['authors'] + options['tags'] + article_count + tag_row_count
+        print(
+            f"Seeded {article_count} articles and {tag_row_count} article-tag rows in {duration:.1f}s "
+            f"({total / duration:,.0f} rows/s overall)."
+        )
+
+    def write_chunk(self, articles, article_tags, using):
+        now = timezone.now()
+        Through = Article.tags.through
+        with transaction.atomic(using=using):
+            Article.objects.using(using).bulk_create([
+                Article(id=article_id, author_id=author_id, title=title, views=views, updated_at=now)
+                for article_id, author_id, title, views in articles
+            ])
+            Through.objects.using(using).bulk_create([
+                Through(article_id=article_id, tag_id=tag_id) for article_id, tag_id in article_tags
+            ])
+
+    def report(self, article_count, tag_row_count, start):
+        rate = (article_count + tag_row_count) / (time.time() - start)
+        print(f"  {article_count} articles, {tag_row_count} tag rows ({rate:,.0f} rows/s)")
+
+    def next_id(self, model, using):
+        return (model.objects.using(using).aggregate(top=Max('id'))['top'] or 0) + 1
+
+    def clear(self, using):
+        """Plain DELETEs: QuerySet.delete() would load every row to send post_delete."""
+        with transaction.atomic(using=using), connections[using].cursor() as cursor:
+            for model in (AuthorStats, Article.tags.through, Article, Tag, Author):
+                cursor.execute(f'DELETE FROM {connections[using].ops.quote_name(model._meta.db_table)}')
+        print("Cleared existing articles, authors, tags and author stats.")
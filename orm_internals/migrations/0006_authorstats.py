@@ -0,0 +1,50 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:29
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+
+
+def backfill_author_stats(apps, schema_editor):
+    """Same as orm_internals.stats.rebuild_author_stats(), on the historical models."""
+    Article = apps.get_model('orm_internals', 'Article')
+    Author = apps.get_model('orm_internals', 'Author')
+    AuthorStats = apps.get_model('orm_internals', 'AuthorStats')
+    using = schema_editor.connection.alias
+    top = Article.objects.using(using).filter(author=OuterRef('pk')).order_by('-views', 'id')
+    rows = Author.objects.using(using).annotate(
+        article_count=Count('article'),
+        top_article_id=Subquery(top.values('id')[:1]),
+        top_views=Subquery(top.values('views')[:1]),
+    ).values_list('id', 'article_count', 'top_article_id', 'top_views')
+    AuthorStats.objects.using(using).bulk_create(
+        [
+            AuthorStats(author_id=author_id, article_count=count, top_article_id=top_id, top_views=views or 0)
+            for author_id, count, top_id, views in rows.iterator()
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orm_internals', '0005_article_views_id_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to='orm_internals.author')),
+                ('article_count', models.IntegerField(default=0)),
+                ('top_views', models.IntegerField(db_index=True, default=0)),
+                ('top_article', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='orm_internals.article')),
+            ],
+            options={
+                'verbose_name_plural': 'author stats',
+                'indexes': [models.Index(fields=['-article_count'], name='authorstats_count_idx')],
+            },
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
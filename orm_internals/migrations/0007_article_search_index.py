@@ -0,0 +1,93 @@
+# Generated by Django 5.2.18 on 2026-10-18 12:33
+
+import django.db.models.deletion
+import orm_internals.models
+from django.db import migrations, models
+
+# The unmanaged ArticleSearchIndex model maps this table. Triggers keep it in sync
+# with every write path (save, update, bulk_create/bulk_update, raw SQL), and an
+# author rename re-indexes that author's articles.
+CREATE_SQL = [
+    """
+    CREATE VIRTUAL TABLE orm_internals_article_fts USING fts5(
+        title, author_name, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER orm_internals_article_fts_insert AFTER INSERT ON orm_internals_article BEGIN
+        INSERT INTO orm_internals_article_fts (rowid, title, author_name)
+        VALUES (new.id, new.title, (SELECT name FROM orm_internals_author WHERE id = new.author_id));
+    END
+    """,
+    """
+    CREATE TRIGGER orm_internals_article_fts_update AFTER UPDATE OF title, author_id ON orm_internals_article BEGIN
+        DELETE FROM orm_internals_article_fts WHERE rowid = old.id;
+        INSERT INTO orm_internals_article_fts (rowid, title, author_name)
+        VALUES (new.id, new.title, (SELECT name FROM orm_internals_author WHERE id = new.author_id));
+    END
+    """,
+    """
+    CREATE TRIGGER orm_internals_article_fts_delete AFTER DELETE ON orm_internals_article BEGIN
+        DELETE FROM orm_internals_article_fts WHERE rowid = old.id;
+    END
+    """,
+    """
+    CREATE TRIGGER orm_internals_author_fts_update AFTER UPDATE OF name ON orm_internals_author BEGIN
+        UPDATE orm_internals_article_fts SET author_name = new.name
+        WHERE rowid IN (SELECT id FROM orm_internals_article WHERE author_id = new.id);
+    END
+    """,
+    """
+    INSERT INTO orm_internals_article_fts (rowid, title, author_name)
+    SELECT article.id, article.title, author.name
+    FROM orm_internals_article AS article
+    LEFT JOIN orm_internals_author AS author ON author.id = article.author_id
+    """,
+]
+
+DROP_SQL = [
+    "DROP TRIGGER IF EXISTS orm_internals_author_fts_update",
+    "DROP TRIGGER IF EXISTS orm_internals_article_fts_delete",
+    "DROP TRIGGER IF EXISTS orm_internals_article_fts_update",
+    "DROP TRIGGER IF EXISTS orm_internals_article_fts_insert",
+    "DROP TABLE IF EXISTS orm_internals_article_fts",
+]
+
+
+def create_search_index(apps, schema_editor):
+    # FTS5 is SQLite only, other databases fall back to LIKE in search.py
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in CREATE_SQL:
+        schema_editor.execute(statement)
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in DROP_SQL:
+        schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orm_internals', '0006_authorstats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchIndex',
+            fields=[
+                ('article', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='orm_internals.article')),
+                ('title', models.TextField()),
+                ('author_name', models.TextField()),
+                ('document', orm_internals.models.FTS5Column(db_column='orm_internals_article_fts')),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'orm_internals_article_fts',
+                'managed': False,
+            },
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
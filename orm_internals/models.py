@@ -1,13 +1,19 @@
 # orm_internals/models.py
 from django.db import models
+from .querycache import CachedQuerySet
 
 class Tag(models.Model):
     name = models.CharField(max_length=50)
+
+    objects = CachedQuerySet.as_manager()
+
     def __str__(self): return self.name
 
 class Author(models.Model):
     name = models.CharField(max_length=100)
 
+    objects = CachedQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
@@ -16,6 +22,88 @@ class Article(models.Model):
     title = models.CharField(max_length=200)
     views = models.IntegerField(default=0)
     tags = models.ManyToManyField(Tag, blank=True)
+    # Set on every save(), v2 of the API exposes it
+    updated_at = models.DateTimeField(auto_now=True)
+
+    # .cached(timeout) for read paths that run the same query over and over
+    objects = CachedQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Supports keyset pagination ordered by (views, id) in either direction
+            models.Index(fields=['views', 'id'], name='article_views_id_idx'),
+        ]
 
     def __str__(self):
-        return self.title
\ No newline at end of file
+        return self.title
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The loaded author/views, so signals.py can tell what a save changed without a query
+        instance._loaded_stats = {
+            name: value for name, value in zip(field_names, values) if name in ('author_id', 'views')
+        }
+        return instance
+
+
+class AuthorStats(models.Model):
+    """
+    Denormalized per-author numbers, so listings and leaderboards are one indexed read
+    instead of Count('article') plus a correlated subquery per author.
+
+    Kept up to date incrementally by signals.py; bulk writes call
+    orm_internals.stats.rebuild_author_stats(), which is also the repair path.
+    """
+    author = models.OneToOneField(Author, on_delete=models.CASCADE, primary_key=True, related_name='stats')
+    article_count = models.IntegerField(default=0)
+    # Most viewed article (ties go to the lowest id) and its views
+    top_article = models.ForeignKey(Article, on_delete=models.SET_NULL, null=True, related_name='+')
+    top_views = models.IntegerField(default=0, db_index=True)
+
+    class Meta:
+        verbose_name_plural = 'author stats'
+        indexes = [
+            models.Index(fields=['-article_count'], name='authorstats_count_idx'),
+        ]
+
+    def __str__(self):
+        return f"Stats for author {self.author_id}"
+
+
+class FTS5Column(models.TextField):
+    """The hidden column an FTS5 table has under its own name, only used for `__match`."""
+
+
+@FTS5Column.register_lookup
+class Match(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', (*lhs_params, *rhs_params)
+
+
+class ArticleSearchIndex(models.Model):
+    """
+    SQLite FTS5 index over article titles and author names.
+
+    The virtual table and the triggers keeping it in sync are created by migration
+    0007 (SQLite only), so this model just lets querysets join it:
+    Article.objects.filter(search_index__document__match='"djang"*'). Use
+    orm_internals.search.search_articles() rather than querying it directly.
+    """
+    article = models.OneToOneField(
+        Article, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        related_name='search_index', db_constraint=False,
+    )
+    title = models.TextField()
+    author_name = models.TextField()
+    document = FTS5Column(db_column='orm_internals_article_fts')
+    # bm25() of the current MATCH, lower is better
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'orm_internals_article_fts'
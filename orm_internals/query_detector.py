@@ -0,0 +1,117 @@
+# orm_internals/query_detector.py
+import os
+import re
+import sys
+from collections import Counter
+from contextlib import ExitStack
+from django.conf import settings
+from django.db import connections
+from orm_internals import querycache
+
+class NPlusOneError(Exception):
+    pass
+
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST_RE = re.compile(r'\bIN\s*\((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_SPACE_RE = re.compile(r'\s+')
+# Frames from here are never the interesting call site
+_LIBRARY_PREFIXES = tuple({sys.prefix, sys.base_prefix, sys.exec_prefix, '<frozen'})
+# Our own ORM plumbing: the detector itself and the query cache's compiler and execute wrapper
+_PLUMBING_FILES = {__file__, querycache.__file__}
+
+def fingerprint(sql):
+    """
+    Normalizes SQL so the same query with different values looks the same.
+
+    Parameters already arrive as %s, this also folds inline literals and collapses
+    IN (%s, %s, ...) lists, whose length changes with the number of ids.
+    """
+    sql = _STRING_RE.sub('?', sql)
+    sql = _NUMBER_RE.sub('?', sql)
+    sql = _IN_LIST_RE.sub('IN (...)', sql)
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class NPlusOneDetector:
+    """
+    Counts repeated SELECTs while active, on every database connection of this thread.
+
+        with NPlusOneDetector(threshold=3):
+            response = view(request)
+            response.render()
+
+    A fingerprint seen `threshold` times or more is reported with the project lines
+    that ran it. With `raise_on_exit` (the default, handy in tests) leaving the block
+    raises NPlusOneError; otherwise read `problems` / `report()` yourself.
+    """
+    # Project frames kept per query, innermost first
+    stack_depth = 3
+
+    def __init__(self, threshold=None, raise_on_exit=True):
+        self.threshold = threshold or getattr(settings, 'NPLUSONE_THRESHOLD', 5)
+        self.raise_on_exit = raise_on_exit
+        self.counts = Counter()
+        self.call_sites = {}  # fingerprint -> Counter of call site tuples
+        self.root = str(settings.BASE_DIR) + os.sep
+        self.stack = None
+        self.wrapper_code = set()
+
+    def __enter__(self):
+        self.stack = ExitStack()
+        # Other execute wrappers run between the caller and us, they are never the call site
+        self.wrapper_code = set()
+        for connection in connections.all():
+            for wrapper in connection.execute_wrappers:
+                code = getattr(wrapper, '__code__', None) or getattr(type(wrapper).__call__, '__code__', None)
+                if code is not None:
+                    self.wrapper_code.add(code)
+            self.stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stack.close()
+        if self.raise_on_exit and exc_type is None and self.problems:
+            raise NPlusOneError(self.report())
+        return False
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() == 'SELECT':
+            key = fingerprint(sql)
+            self.counts[key] += 1
+            self.call_sites.setdefault(key, Counter())[self.get_call_site()] += 1
+        return execute(sql, params, many, context)
+
+    def get_call_site(self):
+        """The innermost frames of our own code, skipping Django, DRF, the stdlib and execute wrappers."""
+        frames = []
+        frame = sys._getframe(2)
+        while frame is not None and len(frames) < self.stack_depth:
+            filename = frame.f_code.co_filename
+            if not (
+                filename in _PLUMBING_FILES or frame.f_code in self.wrapper_code
+                or filename.startswith(_LIBRARY_PREFIXES) or 'site-packages' in filename
+            ):
+                if filename.startswith(self.root):
+                    filename = filename[len(self.root):]
+                frames.append(f"{filename}:{frame.f_lineno} in {frame.f_code.co_name}")
+            frame = frame.f_back
+        return tuple(frames)
+
+    @property
+    def problems(self):
+        """(fingerprint, count, call sites) for every query repeated `threshold` times or more."""
+        return [
+            (key, count, self.call_sites[key].most_common())
+            for key, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+    def report(self):
+        lines = []
+        for key, count, call_sites in self.problems:
+            lines.append(f"{count}x {key}")
+            for frames, times in call_sites:
+                lines.append(f"    {times}x from {' <- '.join(frames) or 'unknown'}")
+        return "Repeated queries (possible N+1):\n" + "\n".join(lines)
@@ -0,0 +1,146 @@
+# orm_internals/querycache.py
+import hashlib
+import re
+import time
+from django.apps import apps
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.sql import Query
+from django.db.models.sql.constants import GET_ITERATOR_CHUNK_SIZE, MULTI, SINGLE
+from drf_internals.cache import get_cache_timeout
+
+DEFAULT_TIMEOUT = 60 * 5
+TABLE_VERSION_PREFIX = 'querycache_table_'
+
+# Tables that SQLite triggers write along with the key table (the FTS5 index of
+# migration 0007). The execute wrapper never sees those statements
+TRIGGERED_WRITES = {
+    'orm_internals_article': ('orm_internals_article_fts',),
+    'orm_internals_author': ('orm_internals_article_fts',),
+}
+
+# Table written by an INSERT / UPDATE / DELETE, as Django (and our raw SQL) quotes it
+_WRITE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:OR\s+\w+\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+OR\s+\w+)?|DELETE\s+FROM)\s+["`\[]?(\w+)',
+    re.IGNORECASE,
+)
+
+def get_table_versions(tables):
+    """Current version of each table, seeded from the clock like the article generation."""
+    keys = {TABLE_VERSION_PREFIX + table: table for table in tables}
+    versions = cache.get_many(keys)
+    for key in keys.keys() - versions.keys():
+        cache.add(key, time.time_ns(), timeout=None)
+        versions[key] = cache.get(key)
+    return [versions[key] for key in sorted(keys)]
+
+def bump_table_versions(tables):
+    """Makes every cached result that read one of `tables` unreachable."""
+    for table in tables:
+        key = TABLE_VERSION_PREFIX + table
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, time.time_ns(), timeout=None)
+
+
+def invalidate_on_write(execute, sql, params, many, context):
+    """
+    Execute wrapper installed on every connection (see signals.py).
+
+    Catching writes at the SQL level covers everything: save(), update(), bulk_create(),
+    the auto-created M2M through tables and raw cursors alike. Inside a transaction the
+    version is bumped again on commit, so a result cached by another thread from the
+    pre-commit data can't outlive the commit.
+    """
+    result = execute(sql, params, many, context)
+    match = _WRITE_RE.match(sql)
+    if match:
+        tables = [match.group(1), *TRIGGERED_WRITES.get(match.group(1), ())]
+        bump_table_versions(tables)
+        connection = context['connection']
+        if connection.in_atomic_block:
+            transaction.on_commit(lambda: bump_table_versions(tables), using=connection.alias)
+    return result
+
+def install_write_hook(connection, **kwargs):
+    """connection_created receiver. Inserted first, so execute_wrapper() blocks still pop their own."""
+    if invalidate_on_write not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, invalidate_on_write)
+
+
+_model_tables = None
+
+def _tables_in(sql, connection):
+    """Model tables the SQL reads, joins and subqueries included."""
+    global _model_tables
+    if _model_tables is None:
+        _model_tables = {model._meta.db_table for model in apps.get_models(include_auto_created=True)}
+    quote = connection.ops.quote_name
+    return [table for table in _model_tables if quote(table) in sql]
+
+
+class CachedQuery(Query):
+    """
+    A Query whose compiler serves SELECT results from the cache.
+
+    Only the raw rows are stored (lists of tuples, before the field converters),
+    so a hit still builds model instances, values() dicts etc. the normal way.
+    """
+    cache_timeout = DEFAULT_TIMEOUT
+
+    def get_compiler(self, using=None, connection=None, elide_empty=True):
+        compiler = super().get_compiler(using, connection, elide_empty)
+        execute_sql = compiler.execute_sql
+        timeout = self.cache_timeout
+
+        def cached_execute_sql(result_type=MULTI, chunked_fetch=False, chunk_size=GET_ITERATOR_CHUNK_SIZE):
+            connection = compiler.connection
+            # Never cache uncommitted data, and iterator() wants rows streamed, not stored
+            if result_type not in (MULTI, SINGLE) or chunked_fetch or connection.in_atomic_block:
+                return execute_sql(result_type, chunked_fetch, chunk_size)
+            try:
+                sql, params = compiler.as_sql()
+            except EmptyResultSet:
+                return execute_sql(result_type, chunked_fetch, chunk_size)
+
+            tables = _tables_in(sql, connection)
+            digest = hashlib.sha1(
+                repr((connection.alias, result_type, sql, params, get_table_versions(tables))).encode('utf-8')
+            ).hexdigest()
+            key = f'querycache_{digest}'
+            hit = cache.get(key)
+            if hit is not None:
+                return hit[0]
+
+            result = execute_sql(result_type, chunked_fetch, chunk_size)
+            if result_type == MULTI:
+                # One chunk, results_iter() chains the chunks anyway
+                result = [[row for chunk in result for row in chunk]]
+            # Wrapped, so a cached "no row" (None) is told apart from a miss
+            cache.set(key, (result,), timeout=get_cache_timeout(timeout))
+            return result
+
+        compiler.execute_sql = cached_execute_sql
+        return compiler
+
+
+class CachedQuerySet(QuerySet):
+    def cached(self, timeout=DEFAULT_TIMEOUT):
+        """
+        Opt-in result caching: Article.objects.select_related('author').cached(60).
+
+        Keyed by the compiled SQL, params and the versions of every table it reads,
+        so any write to one of those tables invalidates it. Filters chained after
+        cached() keep caching; querysets inside transactions and iterator() don't.
+
+        The versions live in the default cache, so invalidation across processes
+        needs a shared backend (Redis, Memcached). On LocMemCache a worker only
+        sees its own writes, and `timeout` is capped (see get_cache_timeout()).
+        """
+        clone = self._chain()
+        clone.query = clone.query.chain(CachedQuery)
+        clone.query.cache_timeout = timeout
+        return clone
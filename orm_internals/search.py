@@ -0,0 +1,63 @@
+# orm_internals/search.py
+import re
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import F, FloatField, Q, Value
+from orm_internals.models import Article, ArticleSearchIndex, Author
+
+# More terms than this are ignored, they only make the MATCH slower
+MAX_TERMS = 10
+
+_TERM_RE = re.compile(r'\w+')
+
+def get_search_terms(text):
+    return _TERM_RE.findall(text or '')[:MAX_TERMS]
+
+def build_match_query(terms):
+    """
+    FTS5 query matching every term as a prefix: 'djan que' -> "djan"* "que"*.
+
+    Terms are quoted, so user input can't use the FTS5 query syntax (NEAR, column
+    filters, ...) or break it.
+    """
+    return ' '.join(f'"{term}"*' for term in terms)
+
+def search_articles(queryset, text):
+    """
+    Filters an Article queryset to the ones whose title or author name match `text`,
+    annotated with `search_rank` (lower is better) and ordered by it.
+
+    On SQLite this is an FTS5 MATCH joined back to the articles by rowid, so the cost
+    depends on the number of matches, not on the table size.
+    """
+    terms = get_search_terms(text)
+    if not terms:
+        return queryset.none()
+
+    if connections[queryset.db].vendor != 'sqlite':
+        # No FTS5 table there, fall back to the LIKE scans the admin used to do
+        condition = Q()
+        for term in terms:
+            condition &= Q(title__icontains=term) | Q(author__name__icontains=term)
+        return queryset.filter(condition).annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    return queryset.filter(search_index__document__match=build_match_query(terms)).annotate(
+        search_rank=F('search_index__rank')
+    ).order_by('search_rank', 'id')
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Refills the FTS table from the article/author tables. Returns the number of rows indexed."""
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    fts_table = quote(ArticleSearchIndex._meta.db_table)
+    with transaction.atomic(using=using), connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {fts_table}")
+        cursor.execute(f"""
+            INSERT INTO {fts_table} (rowid, title, author_name)
+            SELECT article.id, article.title, author.name
+            FROM {quote(Article._meta.db_table)} AS article
+            LEFT JOIN {quote(Author._meta.db_table)} AS author ON author.id = article.author_id
+        """)
+        indexed = cursor.rowcount
+        # Merge the index b-trees, later queries read fewer pages
+        cursor.execute(f"INSERT INTO {fts_table} ({fts_table}) VALUES ('optimize')")
+    return indexed
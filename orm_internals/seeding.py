@@ -0,0 +1,48 @@
+# orm_internals/seeding.py
+# Pure python row generators for the seed_articles command. Nothing here imports
+# Django, so worker processes can run them without setting Django up.
+import itertools
+import random
+
+WORDS = (
+    'django', 'query', 'index', 'cache', 'python', 'scale', 'async', 'model', 'shard',
+    'replica', 'latency', 'signal', 'router', 'stream', 'worker', 'batch', 'join',
+)
+
+_config = {}
+
+def init_worker(config):
+    """Pool initializer: ships the (large) cumulative tag weights to each worker once."""
+    _config.clear()
+    _config.update(config)
+
+def power_law_cum_weights(count, alpha):
+    """Cumulative Zipf weights: tag rank r is picked with probability ~ 1 / r**alpha."""
+    return list(itertools.accumulate(1.0 / (rank ** alpha) for rank in range(1, count + 1)))
+
+def generate_chunk(chunk):
+    """
+    Builds one chunk of article rows and article-tag rows.
+
+    Each chunk has its own RNG seeded from (seed, chunk index), so the output is the
+    same whatever the number of workers or the order chunks finish in.
+    """
+    index, first_id, count = chunk
+    config = _config
+    rng = random.Random(f"{config['seed']}:{index}")
+    author_ids = range(config['first_author_id'], config['first_author_id'] + config['authors'])
+    tag_ids = range(config['first_tag_id'], config['first_tag_id'] + config['tags'])
+    cum_weights = config['cum_weights']
+    max_tags = config['max_tags']
+
+    articles = []
+    article_tags = []
+    for article_id in range(first_id, first_id + count):
+        title = f"Article {article_id}: {' '.join(rng.choices(WORDS, k=3))}"
+        # Views are heavy-tailed too, a few articles get most of the traffic
+        views = min(int(rng.paretovariate(1.2) * 10), 10_000_000)
+        articles.append((article_id, rng.choice(author_ids), title, views))
+        if tag_ids:
+            picked = rng.choices(tag_ids, cum_weights=cum_weights, k=rng.randint(0, max_tags))
+            article_tags.extend((article_id, tag_id) for tag_id in set(picked))
+    return articles, article_tags
@@ -0,0 +1,60 @@
+# orm_internals/signals.py
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from .models import Article, Author, AuthorStats
+from . import stats
+from .querycache import install_write_hook
+
+STATS_FIELDS = ('author_id', 'views')
+
+# Table versions for .cached() querysets are bumped by a hook on every connection
+connection_created.connect(install_write_hook, dispatch_uid='querycache_write_hook')
+# ...including any opened before this app was ready
+for connection in connections.all(initialized_only=True):
+    install_write_hook(connection)
+
+@receiver(post_save, sender=Author)
+def create_author_stats(sender, instance, created, raw=False, using=None, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.using(using).get_or_create(author=instance)
+
+@receiver(pre_save, sender=Article)
+def remember_article_stats(sender, instance, raw=False, using=None, update_fields=None, **kwargs):
+    """Keeps the author/views the row had before this save, for update_author_stats."""
+    instance._stats_before = None
+    if raw or instance._state.adding or instance.pk is None:
+        return
+    if update_fields is not None and not {'author', 'author_id', 'views'} & set(update_fields):
+        return
+    loaded = getattr(instance, '_loaded_stats', {})
+    if all(name in loaded for name in STATS_FIELDS):
+        instance._stats_before = loaded
+    else:
+        # Deferred fields or an instance built by hand: one query for the old values
+        instance._stats_before = Article.objects.using(using).filter(pk=instance.pk).values(*STATS_FIELDS).first()
+
+@receiver(post_save, sender=Article)
+def update_author_stats(sender, instance, created, raw=False, using=None, **kwargs):
+    if raw:
+        return
+    before = getattr(instance, '_stats_before', None)
+    if created:
+        if instance.author_id is not None:
+            stats.article_added(instance, using=using)
+    elif before is not None:
+        if before['author_id'] != instance.author_id:
+            # Moved to another author: both sides change, recompute them
+            changed = {before['author_id'], instance.author_id} - {None}
+            stats.rebuild_author_stats(changed, using=using)
+        elif instance.author_id is not None and before['views'] != instance.views:
+            stats.article_views_changed(instance, before['views'], using=using)
+    instance._loaded_stats = {name: getattr(instance, name) for name in STATS_FIELDS}
+    instance._stats_before = None
+
+@receiver(post_delete, sender=Article)
+def remove_from_author_stats(sender, instance, using=None, **kwargs):
+    author_id = getattr(instance, '_loaded_stats', {}).get('author_id', instance.author_id)
+    if author_id is not None:
+        stats.article_removed(instance, author_id, using=using)
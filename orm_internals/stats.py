@@ -0,0 +1,108 @@
+# orm_internals/stats.py
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import BigIntegerField, Case, Count, F, IntegerField, OuterRef, Q, Subquery, Value, When
+from orm_internals.batching import IN_BATCH_SIZE, batches
+from orm_internals.models import Article, Author, AuthorStats
+
+def rebuild_author_stats(author_ids=None, using=DEFAULT_DB_ALIAS, batch_size=IN_BATCH_SIZE):
+    """
+    Recomputes AuthorStats rows from the article table, for every author when
+    `author_ids` is None. This is the slow aggregate + subquery, batched by author,
+    for repairs and after bulk writes that bypass the signals. Returns the number of rows written.
+    """
+    if author_ids is None:
+        author_ids = Author.objects.using(using).order_by('id').values_list('id', flat=True)
+    author_ids = sorted(set(author_ids))
+
+    top = Article.objects.using(using).filter(author=OuterRef('pk')).order_by('-views', 'id')
+    written = 0
+    for batch in batches(author_ids, batch_size):
+        rows = Author.objects.using(using).filter(id__in=batch).annotate(
+            article_count=Count('article'),
+            top_article_id=Subquery(top.values('id')[:1]),
+            top_views=Subquery(top.values('views')[:1]),
+        ).values_list('id', 'article_count', 'top_article_id', 'top_views')
+        stats = [
+            AuthorStats(author_id=author_id, article_count=count, top_article_id=top_id, top_views=views or 0)
+            for author_id, count, top_id, views in rows
+        ]
+        AuthorStats.objects.using(using).bulk_create(
+            stats,
+            update_conflicts=True,
+            unique_fields=['author'],
+            update_fields=['article_count', 'top_article', 'top_views'],
+        )
+        written += len(stats)
+    return written
+
+def refresh_top_article(author_id, using=DEFAULT_DB_ALIAS):
+    """Re-reads one author's most viewed article, after the current top lost views or was deleted."""
+    top = Article.objects.using(using).filter(author_id=author_id).order_by('-views', 'id').values_list(
+        'id', 'views'
+    ).first()
+    AuthorStats.objects.using(using).filter(pk=author_id).update(
+        top_article_id=top[0] if top else None,
+        top_views=top[1] if top else 0,
+    )
+
+def article_added(article, using=DEFAULT_DB_ALIAS):
+    """One UPDATE: count + 1, and take over the top spot if the new article beats it."""
+    updated = AuthorStats.objects.using(using).filter(pk=article.author_id).update(
+        article_count=F('article_count') + 1,
+        **_top_if_beaten(article),
+    )
+    if not updated:
+        # No stats row yet (e.g. author from a bulk load), build it from scratch
+        rebuild_author_stats([article.author_id], using=using)
+
+def article_views_changed(article, old_views, using=DEFAULT_DB_ALIAS):
+    if article.views > old_views:
+        AuthorStats.objects.using(using).filter(pk=article.author_id).update(**_top_if_beaten(article))
+    elif AuthorStats.objects.using(using).filter(pk=article.author_id, top_article=article.pk).exists():
+        # The top article lost views, another one may be ahead now
+        refresh_top_article(article.author_id, using=using)
+
+def articles_gained_views(article_ids, using=DEFAULT_DB_ALIAS, batch_size=IN_BATCH_SIZE):
+    """
+    Moves the tops after views only went up through update() (no signals), e.g. a
+    ViewCounter flush. One read of the articles, then one UPDATE per author involved.
+    """
+    best = {}
+    for batch in batches(article_ids, batch_size):
+        rows = Article.objects.using(using).filter(
+            id__in=batch, author__isnull=False
+        ).only('id', 'author_id', 'views')
+        for article in rows:
+            current = best.get(article.author_id)
+            if current is None or (article.views, -article.pk) > (current.views, -current.pk):
+                best[article.author_id] = article
+    for author_id, article in best.items():
+        AuthorStats.objects.using(using).filter(pk=author_id).update(**_top_if_beaten(article))
+
+def article_removed(article, author_id, using=DEFAULT_DB_ALIAS):
+    """
+    Update only, never creates a row: when an author is deleted, its articles are
+    deleted (and this runs) right before the author row goes.
+    """
+    AuthorStats.objects.using(using).filter(pk=author_id).update(article_count=F('article_count') - 1)
+    if AuthorStats.objects.using(using).filter(
+        Q(top_article=article.pk) | Q(top_article__isnull=True), pk=author_id, article_count__gt=0
+    ).exists():
+        refresh_top_article(author_id, using=using)
+
+def _top_if_beaten(article):
+    """Keeps the current top unless `article` has more views (or as many and a lower id)."""
+    beaten = (
+        Q(top_article__isnull=True)
+        | Q(top_views__lt=article.views)
+        | Q(top_views=article.views, top_article__gt=article.pk)
+        | Q(top_article=article.pk)
+    )
+    return {
+        'top_article': Case(
+            When(beaten, then=Value(article.pk)), default=F('top_article'), output_field=BigIntegerField()
+        ),
+        'top_views': Case(
+            When(beaten, then=Value(article.views)), default=F('top_views'), output_field=IntegerField()
+        ),
+    }